@@ -0,0 +1,105 @@
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from peewee import Model, CharField, DateTimeField, TextField
+
+from db_peewee.init_database import init_database
+from utils.logger_config import logger
+
+fsm_db = init_database('fsm.db')
+
+# (state, JSON encoded data, time of the last change)
+FSMRecord = Tuple[Optional[str], str, datetime]
+
+
+class FSMStateDB(Model):
+    """
+        Model for the FSM state and data of one conversation.
+
+        Attributes:
+            key (str): Storage key built from bot, chat, user and destiny.
+            state (Optional[str]): Current state, None outside a scenario.
+            data (str): JSON encoded FSM data.
+            updated_at (datetime): Time of the last change, used to expire abandoned states.
+    """
+    key = CharField(primary_key=True)
+    state = CharField(null=True)
+    data = TextField(default='{}')
+    updated_at = DateTimeField(default=datetime.now, index=True)
+
+    class Meta:
+        database = fsm_db
+        table_name = 'fsm_state'
+
+
+def initialize_fsm_db() -> None:
+    """
+        Connects to the database fsm.db and creates the table, if it doesn't exist.
+
+        Returns:
+        None
+    """
+    try:
+        fsm_db.connect(reuse_if_open=True)
+        fsm_db.create_tables([FSMStateDB], safe=True)
+        logger.info("FSM storage initialization completed (table created or already exists).")
+    except Exception as e:
+        logger.error(f"Error initializing fsm.db: {e}", exc_info=True)
+
+
+def load_fsm_record(key: str) -> Optional[FSMRecord]:
+    """
+        Return (Optional[FSMRecord]): state, data and time of the last change stored for the key, None if there is none.
+    """
+    return (FSMStateDB
+            .select(FSMStateDB.state, FSMStateDB.data, FSMStateDB.updated_at)
+            .where(FSMStateDB.key == key)
+            .tuples()
+            .first())
+
+
+def save_fsm_records(records: Dict[str, FSMRecord]) -> None:
+    """
+        Writes changed FSM records in one transaction. Empty records (no state, no data) are deleted.
+
+        Args:
+            records (Dict[str, FSMRecord]): Records per storage key.
+    """
+    rows = [
+        {'key': key, 'state': state, 'data': data, 'updated_at': updated_at}
+        for key, (state, data, updated_at) in records.items()
+        if state is not None or data != '{}'
+    ]
+    empty = [key for key, (state, data, _) in records.items() if state is None and data == '{}']
+
+    with fsm_db.atomic():
+        for start in range(0, len(rows), 200):
+            (FSMStateDB
+             .insert_many(rows[start:start + 200])
+             .on_conflict(
+                 conflict_target=[FSMStateDB.key],
+                 preserve=[FSMStateDB.state, FSMStateDB.data, FSMStateDB.updated_at]
+             )
+             .execute())
+        for start in range(0, len(empty), 500):
+            FSMStateDB.delete().where(FSMStateDB.key.in_(empty[start:start + 500])).execute()
+
+
+def delete_expired_fsm(before: datetime) -> int:
+    """
+        Deletes FSM records not changed since the given time.
+
+        Args:
+            before (datetime): Records changed earlier are deleted.
+
+        Returns:
+            int: Number of deleted records.
+    """
+    with fsm_db.atomic():
+        count = FSMStateDB.delete().where(FSMStateDB.updated_at < before).execute()
+    if count:
+        logger.info(f"Deleted {count} abandoned FSM states")
+    return count
+
+if __name__ == "__main__":
+    initialize_fsm_db()
@@ -1,52 +1,432 @@
-from peewee import Model, CharField, DateTimeField, SqliteDatabase
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from peewee import Model, BigIntegerField, CharField, DateTimeField, ForeignKeyField, IntegerField, chunked
+from playhouse.migrate import SqliteMigrator, migrate
+from playhouse.sqlite_ext import FTS5Model, SearchField
 
 from db_peewee.init_database import init_database
-from utils.languages import LANGUAGES
 from utils.logger_config import logger
+from utils.near_duplicates import BANDS, NEAR_DUP_DAYS, bands, fingerprint_news, hamming, to_signed
 
 news_db = init_database('news.db')
 
-fields = {
-    'url': CharField(unique=True),
-    'thumbnail': CharField(null=True),
-    'createdat': DateTimeField(),
-}
 
-for lang in LANGUAGES:
-    fields[f'title_{lang}'] = CharField(null=True)
-    fields[f'description_{lang}'] = CharField(null=True)
+class NewsDB(Model):
+    """
+        Model for a news item, independent of language.
+
+        Attributes:
+            url (str): Link to the original news, unique.
+            thumbnail (Optional[str]): Link to the news image.
+            createdat (datetime): Publication time.
+    """
+    url = CharField(unique=True)
+    thumbnail = CharField(null=True)
+    createdat = DateTimeField(index=True)
+
+    class Meta:
+        database = news_db
+        table_name = 'newsdb'
+
+
+class NewsTranslation(Model):
+    """
+        Model for the title and description of a news item in one language.
+        The English original is stored as the 'en' row.
+
+        Attributes:
+            news (NewsDB): The news item.
+            lang (str): Language code, e.g. 'en', 'ru', 'fr'.
+            title (Optional[str]): Title in this language.
+            description (Optional[str]): Description in this language.
+    """
+    news = ForeignKeyField(NewsDB, backref='translations', on_delete='CASCADE')
+    lang = CharField(max_length=8)
+    title = CharField(null=True)
+    description = CharField(null=True)
+
+    class Meta:
+        database = news_db
+        table_name = 'newstranslation'
+        indexes = (
+            (('news', 'lang'), True),
+        )
+
 
-NewsDB = type('NewsDB', (Model,), {
-    **fields,
-    'Meta': type('Meta', (), {'database': news_db})
-})
+class NewsFTS(FTS5Model):
+    """
+        FTS5 index over the English titles and descriptions, used for keyword search.
+        It is an external content table: rowid is the id of the 'en' NewsTranslation row
+        and the text is kept in sync by triggers.
+    """
+    title = SearchField()
+    description = SearchField()
+
+    class Meta:
+        database = news_db
+        table_name = 'news_fts'
+        options = {
+            'content': NewsTranslation,
+            'content_rowid': 'id',
+            'tokenize': 'unicode61 remove_diacritics 2',
+        }
+
+
+class NewsFingerprint(Model):
+    """
+        Model for the near-duplicate fingerprint of a news item, see utils.near_duplicates.
+
+        Attributes:
+            news (NewsDB): The news item.
+            canonical_url (str): URL without tracking parameters and other variations.
+            simhash (int): 64-bit SimHash of the English title and description, stored signed.
+            band0..band3 (int): 16-bit bands of the SimHash, each indexed for candidate lookup.
+            createdat (datetime): Publication time of the news, limits the comparison window.
+    """
+    news = ForeignKeyField(NewsDB, backref='fingerprint', on_delete='CASCADE', unique=True)
+    canonical_url = CharField(index=True)
+    simhash = BigIntegerField()
+    band0 = IntegerField(index=True)
+    band1 = IntegerField(index=True)
+    band2 = IntegerField(index=True)
+    band3 = IntegerField(index=True)
+    createdat = DateTimeField(index=True)
+
+    class Meta:
+        database = news_db
+        table_name = 'news_fingerprint'
+
+
+class SourceStateDB(Model):
+    """
+        Model for the conditional GET state of a news source, so unchanged feeds are answered with 304.
+
+        Attributes:
+            name (str): Source name.
+            etag (Optional[str]): ETag of the last response.
+            last_modified (Optional[str]): Last-Modified header of the last response.
+            updated_at (datetime): Time of the last fetch with new content.
+    """
+    name = CharField(primary_key=True)
+    etag = CharField(null=True)
+    last_modified = CharField(null=True)
+    updated_at = DateTimeField(default=datetime.now)
+
+    class Meta:
+        database = news_db
+        table_name = 'source_state'
+
+
+class QuotaUsageDB(Model):
+    """
+        Model for the requests spent today on a metered news API, so a restart keeps the daily budget.
+
+        Attributes:
+            name (str): Quota name, e.g. 'rapidapi'.
+            day (str): UTC day of the usage, ISO format.
+            used (int): Requests spent on that day.
+            reserved_used (int): Requests of the digests' reserve spent on that day.
+    """
+    name = CharField(primary_key=True)
+    day = CharField()
+    used = IntegerField(default=0)
+    reserved_used = IntegerField(default=0)
+
+    class Meta:
+        database = news_db
+        table_name = 'quota_usage'
+
+
+NEWS_FTS_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS newstranslation_fts_insert AFTER INSERT ON newstranslation
+    WHEN new.lang = 'en' BEGIN
+        INSERT INTO news_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS newstranslation_fts_delete AFTER DELETE ON newstranslation
+    WHEN old.lang = 'en' BEGIN
+        INSERT INTO news_fts(news_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS newstranslation_fts_update AFTER UPDATE OF title, description ON newstranslation
+    WHEN new.lang = 'en' BEGIN
+        INSERT INTO news_fts(news_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO news_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+)
+
+# Triggers of the FTS index over the former wide newsdb table.
+LEGACY_FTS_TRIGGERS = ('newsdb_fts_insert', 'newsdb_fts_delete', 'newsdb_fts_update')
+
+
+def migrate_wide_news_table() -> None:
+    """
+        Moves title_{lang}/description_{lang} columns of the former wide newsdb table
+        into NewsTranslation rows and drops those columns.
+        Does nothing if the table is already normalized.
+    """
+    columns = [column.name for column in news_db.get_columns(NewsDB._meta.table_name)] # type: ignore
+    langs = [name[len('title_'):] for name in columns
+             if name.startswith('title_') and name[len('title_'):].isalpha()
+             and f"description_{name[len('title_'):]}" in columns]
+    if not langs:
+        return
+
+    logger.info(f"Migrating news.db to the translations table, languages: {langs}")
+    with news_db.atomic():
+        for trigger in LEGACY_FTS_TRIGGERS:
+            news_db.execute_sql(f"DROP TRIGGER IF EXISTS {trigger}")
+        news_db.execute_sql("DROP TABLE IF EXISTS news_fts")
+
+        for lang in langs:
+            news_db.execute_sql(
+                f"INSERT OR IGNORE INTO newstranslation (news_id, lang, title, description) "
+                f"SELECT id, ?, title_{lang}, description_{lang} FROM newsdb "
+                f"WHERE title_{lang} IS NOT NULL OR description_{lang} IS NOT NULL",
+                (lang,)
+            )
+
+        migrator = SqliteMigrator(news_db)
+        operations = []
+        for lang in langs:
+            operations.append(migrator.drop_column('newsdb', f'title_{lang}'))
+            operations.append(migrator.drop_column('newsdb', f'description_{lang}'))
+        migrate(*operations)
+        news_db.execute_sql("CREATE INDEX IF NOT EXISTS newsdb_createdat ON newsdb (createdat)")
+    logger.info("Migration of news.db completed")
+
+
+def initialize_news_fts() -> None:
+    """
+        Creates the FTS5 keyword index and its triggers, if they don't exist.
+        A newly created index is filled from the English rows already stored in news.db;
+        an index that also holds other languages is filled again.
+    """
+    if NewsFTS._meta.table_name in news_db.get_tables(): # type: ignore
+        indexed = news_db.execute_sql("SELECT COUNT(*) FROM news_fts_docsize").fetchone()[0]
+        english = NewsTranslation.select().where(NewsTranslation.lang == 'en').count()
+        if indexed != english:
+            logger.info(f"FTS5 keyword index holds {indexed} rows for {english} English news, refilling it")
+            with news_db.atomic():
+                news_db.execute_sql("INSERT INTO news_fts(news_fts) VALUES ('delete-all')")
+                fill_news_fts()
+        return
+
+    logger.info("Creating FTS5 keyword index for news.db")
+    with news_db.atomic():
+        news_db.create_tables([NewsFTS], safe=True)
+        for trigger in NEWS_FTS_TRIGGERS:
+            news_db.execute_sql(trigger)
+        fill_news_fts()
+    logger.info("FTS5 keyword index created")
+
+
+def fill_news_fts() -> None:
+    """
+        Indexes the English translations. rebuild() is not used: it would index
+        the external content table in every language, while the triggers keep only 'en'.
+    """
+    news_db.execute_sql(
+        "INSERT INTO news_fts(rowid, title, description) "
+        "SELECT id, title, description FROM newstranslation WHERE lang = 'en'"
+    )
+
+
+def initialize_news_fingerprints(days: int = NEAR_DUP_DAYS) -> None:
+    """
+        Creates the near-duplicate fingerprint table, if it doesn't exist,
+        and fingerprints the news of the last days already stored in news.db.
+    """
+    if NewsFingerprint._meta.table_name in news_db.get_tables(): # type: ignore
+        return
+
+    logger.info("Creating near-duplicate fingerprints for news.db")
+    with news_db.atomic():
+        news_db.create_tables([NewsFingerprint], safe=True)
+        query = (NewsDB
+                 .select(NewsDB.id, NewsDB.url, NewsDB.createdat, NewsTranslation.title, NewsTranslation.description)
+                 .join(NewsTranslation, on=(
+                     (NewsTranslation.news == NewsDB.id) & (NewsTranslation.lang == 'en')
+                 ))
+                 .where(NewsDB.createdat >= datetime.now() - timedelta(days=days))
+                 .tuples())
+        save_fingerprints([
+            (news_id, *fingerprint_news(url, title, description), createdat)
+            for news_id, url, createdat, title, description in query
+        ])
+
+
+def find_near_duplicate(
+        canonical_url: str,
+        fingerprint: int,
+        since: datetime,
+        max_distance: int
+) -> Optional[int]:
+    """
+        Look for a stored news item that is a near-duplicate of a new one.
+
+        Args:
+            canonical_url (str): Canonical URL of the new item.
+            fingerprint (int): Unsigned SimHash of the new item.
+            since (datetime): Only news published after this time are compared.
+            max_distance (int): Maximum Hamming distance of near-duplicates.
+
+        Returns:
+            Optional[int]: Id of the duplicate news, None if the item is new.
+    """
+    same_url = (NewsFingerprint
+                .select(NewsFingerprint.news)
+                .where(NewsFingerprint.canonical_url == canonical_url)
+                .tuples()
+                .first())
+    if same_url:
+        return same_url[0]
+    if not fingerprint:
+        return None
+
+    item_bands = bands(fingerprint)
+    band_fields = [NewsFingerprint.band0, NewsFingerprint.band1, NewsFingerprint.band2, NewsFingerprint.band3]
+    match = band_fields[0] == item_bands[0]
+    for field, value in zip(band_fields[1:BANDS], item_bands[1:]):
+        match |= field == value
+    candidates = (NewsFingerprint
+                  .select(NewsFingerprint.news, NewsFingerprint.simhash)
+                  .where(match & (NewsFingerprint.createdat >= since))
+                  .tuples())
+    for news_id, candidate in candidates:
+        if hamming(fingerprint, candidate) <= max_distance:
+            return news_id
+    return None
+
+
+def save_fingerprints(fingerprints: List[Tuple[int, str, int, datetime]]) -> None:
+    """
+        Stores the near-duplicate fingerprints of news items, in batches.
+
+        Args:
+            fingerprints (List[Tuple[int, str, int, datetime]]): News id, canonical URL,
+                unsigned SimHash and publication time of each item.
+    """
+    rows = []
+    for news_id, canonical_url, fingerprint, createdat in fingerprints:
+        item_bands = bands(fingerprint)
+        rows.append({
+            'news': news_id,
+            'canonical_url': canonical_url,
+            'simhash': to_signed(fingerprint),
+            'band0': item_bands[0],
+            'band1': item_bands[1],
+            'band2': item_bands[2],
+            'band3': item_bands[3],
+            'createdat': createdat,
+        })
+    with news_db.atomic():
+        for batch in chunked(rows, 100):
+            NewsFingerprint.insert_many(batch).on_conflict_ignore().execute()
 
 
 def initialize_news_db( ) -> None:
     """
-        Connects to the database news.db and creates table, if it doesn't exist.
+        Creates the tables of news.db, if they don't exist. The connection stays open.
+        A news.db with the former wide table is migrated to the translations table.
     """
     try:
-        if news_db.is_closed():
-            logger.info("Connecting to news.db")
-            news_db.connect()
-        else:
-            logger.info("Already connected to news.db")
+        news_db.connect(reuse_if_open=True)
 
         tables = news_db.get_tables()
-        if NewsDB._meta.table_name not in tables: # type: ignore
+        if NewsDB._meta.table_name not in tables or NewsTranslation._meta.table_name not in tables: # type: ignore
             logger.info("Table does not exist, creating tables...")
-            news_db.create_tables([NewsDB], safe=True)
+            news_db.create_tables([NewsDB, NewsTranslation], safe=True)
             logger.info("Tables created successfully")
         else:
             logger.info("Tables already exist, skipping creation")
 
+        news_db.create_tables([SourceStateDB, QuotaUsageDB], safe=True)
+        migrate_wide_news_table()
+        initialize_news_fts()
+        initialize_news_fingerprints()
+
     except Exception as e:
         logger.error(f"Exception in function 'initialize_news_db': {e}", exc_info=True)
-    finally:
-        if not news_db.is_closed():
-            news_db.close()
-            logger.info("Connection to news.db closed")
+
+def news_ids_by_url(urls: List[str]) -> Dict[str, int]:
+    """
+        Look up stored news by URL through the unique index, in batches of the given URLs,
+        so the cost follows the number of URLs and not the size of the table.
+
+        Args:
+            urls (List[str]): URLs to look up.
+
+        Returns:
+            Dict[str, int]: Id of each stored news by URL; URLs not stored are missing.
+    """
+    ids: Dict[str, int] = {}
+    for batch in chunked(urls, 500):
+        query = NewsDB.select(NewsDB.url, NewsDB.id).where(NewsDB.url.in_(batch)).tuples()
+        ids.update(query)
+    return ids
+
+def load_source_states(names: List[str]) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+    """
+        Return (Dict[str, Tuple[Optional[str], Optional[str]]]): (etag, last_modified) of the sources by name.
+    """
+    query = (SourceStateDB
+             .select(SourceStateDB.name, SourceStateDB.etag, SourceStateDB.last_modified)
+             .where(SourceStateDB.name.in_(names))
+             .tuples())
+    return {name: (etag, last_modified) for name, etag, last_modified in query}
+
+
+def save_source_states(states: Dict[str, Tuple[Optional[str], Optional[str]]]) -> None:
+    """
+        Stores (etag, last_modified) of the sources by name in one transaction.
+    """
+    if not states:
+        return
+    rows = [
+        {'name': name, 'etag': etag, 'last_modified': last_modified, 'updated_at': datetime.now()}
+        for name, (etag, last_modified) in states.items()
+    ]
+    with news_db.atomic():
+        (SourceStateDB
+         .insert_many(rows)
+         .on_conflict(
+             conflict_target=[SourceStateDB.name],
+             preserve=[SourceStateDB.etag, SourceStateDB.last_modified, SourceStateDB.updated_at]
+         )
+         .execute())
+
+def load_quota_usage(name: str) -> Optional[Tuple[str, int, int]]:
+    """
+        Return (Optional[Tuple[str, int, int]]): stored (day, used, reserved_used) of a quota, None if not stored yet.
+    """
+    return (QuotaUsageDB
+            .select(QuotaUsageDB.day, QuotaUsageDB.used, QuotaUsageDB.reserved_used)
+            .where(QuotaUsageDB.name == name)
+            .tuples()
+            .first())
+
+
+def save_quota_usage(name: str, day: str, used: int, reserved_used: int) -> None:
+    """
+        Stores the usage of a quota for the day.
+    """
+    (QuotaUsageDB
+     .insert(name=name, day=day, used=used, reserved_used=reserved_used)
+     .on_conflict(
+         conflict_target=[QuotaUsageDB.name],
+         preserve=[QuotaUsageDB.day, QuotaUsageDB.used, QuotaUsageDB.reserved_used]
+     )
+     .execute())
 
 if __name__ == "__main__":
-    initialize_news_db()
\ No newline at end of file
+    initialize_news_db()
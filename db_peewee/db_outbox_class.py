@@ -0,0 +1,336 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from peewee import Model, AutoField, BooleanField, CharField, DateTimeField, IntegerField, TextField
+
+from db_peewee.init_database import init_database
+from utils.logger_config import logger
+
+outbox_db = init_database('outbox.db')
+
+PENDING = "pending"
+SENDING = "sending"
+DELIVERED = "delivered"
+FAILED = "failed"
+
+# chunk_index of the marker row of a group rendered without messages
+EMPTY_DIGEST_CHUNK = -1
+
+
+class DigestDB(Model):
+    """
+        Model for a newsletter run.
+
+        Attributes:
+            digest_id (str): Identifier of the run, for example '2025-06-21-morning'.
+            planned (bool): True when outbox rows were created for every user.
+            created_at (datetime): Time the run was started.
+    """
+    digest_id = CharField(primary_key=True)
+    planned = BooleanField(default=False)
+    created_at = DateTimeField(default=datetime.now)
+
+    class Meta:
+        database = outbox_db
+
+
+class DigestChunkDB(Model):
+    """
+        Model for a rendered message of a digest, shared by every user of the same group.
+
+        Attributes:
+            digest_id (str): Identifier of the run.
+            group_key (str): Settings group, see auto_send_news.group_key_str.
+            chunk_index (int): Position of the message in the digest.
+            text (str): Message text.
+    """
+    id = AutoField()
+    digest_id = CharField()
+    group_key = CharField()
+    chunk_index = IntegerField()
+    text = TextField()
+
+    class Meta:
+        database = outbox_db
+        indexes = (
+            (('digest_id', 'group_key', 'chunk_index'), True),
+        )
+
+
+class OutboxDB(Model):
+    """
+        Model for one message of a digest addressed to one user.
+
+        Attributes:
+            user_id (int): Telegram user id.
+            digest_id (str): Identifier of the run.
+            group_key (str): Settings group of the user at planning time.
+            chunk_index (int): Position of the message in the digest.
+            status (str): One of 'pending', 'sending', 'delivered', 'failed'.
+            updated_at (datetime): Time of the last status change.
+    """
+    id = AutoField()
+    user_id = IntegerField()
+    digest_id = CharField()
+    group_key = CharField()
+    chunk_index = IntegerField()
+    status = CharField(default=PENDING)
+    updated_at = DateTimeField(default=datetime.now)
+
+    class Meta:
+        database = outbox_db
+        indexes = (
+            (('user_id', 'digest_id', 'chunk_index'), True),
+            (('digest_id', 'status', 'user_id'), False),
+        )
+
+
+def initialize_outbox_db() -> None:
+    """
+        Connects to the database outbox.db and creates tables, if they don't exist.
+
+        Returns:
+        None
+    """
+    try:
+        outbox_db.connect(reuse_if_open=True)
+        outbox_db.create_tables([DigestDB, DigestChunkDB, OutboxDB], safe=True)
+        logger.info("Outbox initialization completed (tables created or already exist).")
+    except Exception as e:
+        logger.error(f"Error initializing outbox.db: {e}", exc_info=True)
+
+
+def get_digest(digest_id: str) -> Optional[DigestDB]:
+    """
+    Return (Optional[DigestDB]): the newsletter run or None if it was never started.
+
+    Args:
+        digest_id (str): Identifier of the run.
+    """
+    return DigestDB.get_or_none(DigestDB.digest_id == digest_id)
+
+
+def start_digest(digest_id: str) -> None:
+    """
+    Registers a newsletter run, if it is not registered yet.
+
+    Args:
+        digest_id (str): Identifier of the run.
+    """
+    DigestDB.insert(digest_id=digest_id).on_conflict_ignore().execute()
+
+
+def mark_digest_planned(digest_id: str) -> None:
+    """
+    Marks that outbox rows were created for every user of the run.
+
+    Args:
+        digest_id (str): Identifier of the run.
+    """
+    DigestDB.update(planned=True).where(DigestDB.digest_id == digest_id).execute()
+
+
+def load_digest_chunks(digest_id: str, group_key: str) -> Optional[List[str]]:
+    """
+    Return (Optional[List[str]]): stored messages of a group, empty if the group was rendered without
+    messages, or None if the group was not rendered yet.
+
+    Args:
+        digest_id (str): Identifier of the run.
+        group_key (str): Settings group.
+    """
+    rows = list(DigestChunkDB
+                .select(DigestChunkDB.chunk_index, DigestChunkDB.text)
+                .where((DigestChunkDB.digest_id == digest_id) & (DigestChunkDB.group_key == group_key))
+                .order_by(DigestChunkDB.chunk_index)
+                .tuples())
+    if not rows:
+        return None
+    return [text for chunk_index, text in rows if chunk_index != EMPTY_DIGEST_CHUNK]
+
+
+def save_digest_chunks(digest_id: str, group_key: str, messages: List[str]) -> None:
+    """
+    Stores rendered messages of a group, so a resumed run sends exactly the same text.
+
+    Args:
+        digest_id (str): Identifier of the run.
+        group_key (str): Settings group.
+        messages (List[str]): Rendered messages.
+    """
+    rows = [
+        {"digest_id": digest_id, "group_key": group_key, "chunk_index": idx, "text": text}
+        for idx, text in enumerate(messages)
+    ]
+    if not rows:
+        # A marker row, so a resumed run does not render an empty group again
+        rows = [{"digest_id": digest_id, "group_key": group_key, "chunk_index": EMPTY_DIGEST_CHUNK, "text": ""}]
+    with outbox_db.atomic():
+        DigestChunkDB.insert_many(rows).on_conflict_ignore().execute()
+
+
+def enqueue_deliveries(digest_id: str, deliveries: List[Tuple[int, str, int]]) -> None:
+    """
+    Creates pending outbox rows in one transaction. Rows that already exist are left as they are.
+
+    Args:
+        digest_id (str): Identifier of the run.
+        deliveries (List[Tuple[int, str, int]]): (user_id, group_key, chunk_index) tuples.
+    """
+    if not deliveries:
+        return
+    rows = [
+        {"user_id": user_id, "digest_id": digest_id, "group_key": group_key, "chunk_index": idx}
+        for user_id, group_key, idx in deliveries
+    ]
+    with outbox_db.atomic():
+        for start in range(0, len(rows), 100):
+            OutboxDB.insert_many(rows[start:start + 100]).on_conflict_ignore().execute()
+
+
+def release_claimed(digest_id: str) -> int:
+    """
+    Returns rows claimed by a previous process back to the pending state.
+    Only call it when no sender of this run is active, i.e. when resuming after a restart.
+
+    Args:
+        digest_id (str): Identifier of the run.
+
+    Returns:
+        int: Number of released rows.
+    """
+    return (OutboxDB
+            .update(status=PENDING, updated_at=datetime.now())
+            .where((OutboxDB.digest_id == digest_id) & (OutboxDB.status == SENDING))
+            .execute())
+
+
+def claim_deliveries(digest_id: str, batch_size: int) -> Dict[int, List[Tuple[int, str]]]:
+    """
+    Claims pending rows of up to batch_size users and marks them as sending.
+    All pending messages of a user are claimed together, so they are sent in order.
+
+    Args:
+        digest_id (str): Identifier of the run.
+        batch_size (int): Maximum number of users in the batch.
+
+    Returns:
+        Dict[int, List[Tuple[int, str]]]: (outbox row id, text) lists by user id, in chunk order.
+    """
+    with outbox_db.atomic():
+        user_ids = [
+            user_id for (user_id,) in
+            OutboxDB
+            .select(OutboxDB.user_id)
+            .where((OutboxDB.digest_id == digest_id) & (OutboxDB.status == PENDING))
+            .group_by(OutboxDB.user_id)
+            .order_by(OutboxDB.user_id)
+            .limit(batch_size)
+            .tuples()
+        ]
+        if not user_ids:
+            return {}
+
+        rows = (OutboxDB
+                .select(OutboxDB.id, OutboxDB.user_id, DigestChunkDB.text)
+                .join(DigestChunkDB, on=(
+                    (DigestChunkDB.digest_id == OutboxDB.digest_id) &
+                    (DigestChunkDB.group_key == OutboxDB.group_key) &
+                    (DigestChunkDB.chunk_index == OutboxDB.chunk_index)
+                ))
+                .where(
+                    (OutboxDB.digest_id == digest_id) &
+                    (OutboxDB.status == PENDING) &
+                    (OutboxDB.user_id.in_(user_ids))
+                )
+                .order_by(OutboxDB.user_id, OutboxDB.chunk_index)
+                .tuples())
+
+        claimed: Dict[int, List[Tuple[int, str]]] = {}
+        row_ids: List[int] = []
+        for row_id, user_id, text in rows:
+            claimed.setdefault(user_id, []).append((row_id, text))
+            row_ids.append(row_id)
+
+        now = datetime.now()
+        for start in range(0, len(row_ids), 500):
+            (OutboxDB
+             .update(status=SENDING, updated_at=now)
+             .where(OutboxDB.id.in_(row_ids[start:start + 500]))
+             .execute())
+        # Rows without a rendered message can never be sent
+        orphaned = (OutboxDB
+                    .update(status=FAILED, updated_at=now)
+                    .where(
+                        (OutboxDB.digest_id == digest_id) &
+                        (OutboxDB.status == PENDING) &
+                        (OutboxDB.user_id.in_(user_ids))
+                    )
+                    .execute())
+    if orphaned:
+        logger.warning(f"Digest '{digest_id}': {orphaned} outbox rows without a message marked as failed")
+    return claimed
+
+
+def mark_deliveries(row_ids: List[int], status: str) -> None:
+    """
+    Sets the status of outbox rows in one transaction.
+
+    Args:
+        row_ids (List[int]): Outbox row ids.
+        status (str): New status.
+    """
+    if not row_ids:
+        return
+    now = datetime.now()
+    with outbox_db.atomic():
+        for start in range(0, len(row_ids), 500):
+            (OutboxDB
+             .update(status=status, updated_at=now)
+             .where(OutboxDB.id.in_(row_ids[start:start + 500]))
+             .execute())
+
+
+def unfinished_digests() -> List[str]:
+    """
+    Return (List[str]): identifiers of runs that were not planned completely or still have undelivered rows.
+    """
+    pending = {
+        digest_id for (digest_id,) in
+        OutboxDB
+        .select(OutboxDB.digest_id)
+        .where(OutboxDB.status.in_([PENDING, SENDING]))
+        .distinct()
+        .tuples()
+    }
+    unplanned = {
+        digest_id for (digest_id,) in
+        DigestDB.select(DigestDB.digest_id).where(DigestDB.planned == False).tuples()  # noqa: E712
+    }
+    return sorted(pending | unplanned)
+
+
+def prune_outbox(days: int = 7) -> None:
+    """
+    Deletes runs older than the given number of days.
+
+    Args:
+        days (int): Retention period.
+    """
+    old = [
+        digest_id for (digest_id,) in
+        DigestDB.select(DigestDB.digest_id)
+        .where(DigestDB.created_at < datetime.now() - timedelta(days=days))
+        .tuples()
+    ]
+    if not old:
+        return
+    with outbox_db.atomic():
+        OutboxDB.delete().where(OutboxDB.digest_id.in_(old)).execute()
+        DigestChunkDB.delete().where(DigestChunkDB.digest_id.in_(old)).execute()
+        DigestDB.delete().where(DigestDB.digest_id.in_(old)).execute()
+    logger.info(f"Pruned {len(old)} old digests from outbox.db")
+
+
+if __name__ == "__main__":
+    initialize_outbox_db()
@@ -0,0 +1,76 @@
+from datetime import datetime
+from typing import Dict, List
+
+from peewee import Model, CharField, DateTimeField, TextField, chunked
+
+from db_peewee.init_database import init_database
+from utils.logger_config import logger
+
+translation_memory_db = init_database('translation_memory.db')
+
+
+class TranslationMemoryDB(Model):
+    """
+        Model for a stored translation of a source text.
+
+        Attributes:
+            source_hash (str): SHA-256 of the source text.
+            lang (str): Target language code.
+            text (str): Translated text.
+            created_at (datetime): Time the translation was stored.
+    """
+    source_hash = CharField(max_length=64)
+    lang = CharField(max_length=8)
+    text = TextField()
+    created_at = DateTimeField(default=datetime.now)
+
+    class Meta:
+        database = translation_memory_db
+        table_name = 'translation_memory'
+        indexes = (
+            (('source_hash', 'lang'), True),
+        )
+
+
+def initialize_translation_memory_db() -> None:
+    """
+        Connects to the database translation_memory.db and creates the table, if it doesn't exist.
+
+        Returns:
+        None
+    """
+    try:
+        translation_memory_db.connect(reuse_if_open=True)
+        translation_memory_db.create_tables([TranslationMemoryDB], safe=True)
+    except Exception as e:
+        logger.error(f"Error initializing translation_memory.db: {e}", exc_info=True)
+
+
+def lookup_translations(lang: str, source_hashes: List[str]) -> Dict[str, str]:
+    """
+        Return (Dict[str, str]): stored translations into the language by source hash, for the hashes that have one.
+    """
+    found: Dict[str, str] = {}
+    for batch in chunked(source_hashes, 500):
+        query = (TranslationMemoryDB
+                 .select(TranslationMemoryDB.source_hash, TranslationMemoryDB.text)
+                 .where((TranslationMemoryDB.lang == lang) & (TranslationMemoryDB.source_hash.in_(batch)))
+                 .tuples())
+        found.update(query)
+    return found
+
+
+def store_translations(lang: str, translations: Dict[str, str]) -> None:
+    """
+        Stores translations into the language by source hash in one transaction, replacing older ones.
+    """
+    rows = [{'source_hash': h, 'lang': lang, 'text': text} for h, text in translations.items()]
+    with translation_memory_db.atomic():
+        for batch in chunked(rows, 200):
+            (TranslationMemoryDB
+             .insert_many(batch)
+             .on_conflict(
+                 conflict_target=[TranslationMemoryDB.source_hash, TranslationMemoryDB.lang],
+                 preserve=[TranslationMemoryDB.text, TranslationMemoryDB.created_at]
+             )
+             .execute())
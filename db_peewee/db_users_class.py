@@ -1,10 +1,11 @@
-import traceback
-from typing import Optional, Tuple, List, Union
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple, List, Union
 
 from db_peewee.init_database import init_database
-from peewee import Model, IntegerField, CharField, BooleanField
-from utils.decorators.lang_decorators import print_lang_result
+from peewee import Model, IntegerField, CharField, BooleanField, DateTimeField, chunked
+from playhouse.migrate import SqliteMigrator, migrate
 from utils.logger_config import logger
+from utils.user_cache import UserProfile
 
 user_db = init_database('users.db')
 
@@ -21,6 +22,8 @@ class UserDB(Model):
             is_bot (bool): Info about User or Bot, if the bot value is True then the value is False.
             news_choice (str): Type of format news, which user was selected (all news or news by keyword).
             news_keywords (Optional[str]): The keywords that the user selected.
+            is_active (bool): False if the user blocked the bot or deleted the account; such users get no newsletters.
+            blocked_at (Optional[datetime]): When the user was found unreachable.
     """
     user_id = IntegerField(primary_key=True)
     username = CharField(null=True)
@@ -30,6 +33,8 @@ class UserDB(Model):
     is_bot = BooleanField(default=False)
     news_choice = CharField(null=True)
     news_keywords = CharField(null=True)
+    is_active = BooleanField(default=True, index=True)
+    blocked_at = DateTimeField(null=True)
 
     class Meta:
         database = user_db
@@ -37,7 +42,7 @@ class UserDB(Model):
 
 def initialize_user_db() -> None:
     """
-        Connects to the database user_db and creates table, if it doesn't exist.
+        Creates the table of users.db, if it doesn't exist. The connection stays open.
 
         Returns:
         None
@@ -46,110 +51,208 @@ def initialize_user_db() -> None:
 
     try:
         logger.info("Starting userdb initialization...")
-        user_db.connect()
+        user_db.connect(reuse_if_open=True)
+        # Columns are added before create_tables creates the indexes on them
+        if UserDB._meta.table_name in user_db.get_tables(): # type: ignore
+            migrate_user_db()
         user_db.create_tables([UserDB], safe=True)
         logger.info("Userdb initialization completed (table created or already exists).")
     except Exception as e:
         logger.error(f"Error initializing userdb: {e}", exc_info=True)
-    finally:
-        user_db.close()
 
 
-def save_user_to_db(user_data: dict) -> None:
+def migrate_user_db() -> None:
     """
-    Saves or updates user data in the userdb database.
+        Adds columns that were introduced after the table was created.
 
-    Args:
-        user_data (dict): User data from callback Telegram.
-
-    Returns:
+        Returns:
         None
     """
-    try:
-        if user_db.is_closed():
-            user_db.connect()
+    table = UserDB._meta.table_name # type: ignore
+    columns = {column.name for column in user_db.get_columns(table)}
+    migrator = SqliteMigrator(user_db)
+    operations = []
+
+    if 'is_active' not in columns:
+        # Created by create_tables on the missing column, where SQLite took "is_active" for a string literal
+        if any(index.name == 'userdb_is_active' for index in user_db.get_indexes(table)):
+            operations.append(migrator.drop_index(table, 'userdb_is_active'))
+        # add_column also creates the index, as the field is declared with index=True
+        operations.append(migrator.add_column(table, 'is_active', UserDB.is_active))
+    if 'blocked_at' not in columns:
+        operations.append(migrator.add_column(table, 'blocked_at', UserDB.blocked_at))
+
+    if operations:
+        logger.info(f"Migrating users.db: {len(operations)} operations")
+        with user_db.atomic():
+            migrate(*operations)
+
+
+def user_record(user_data: dict) -> Dict[str, Any]:
+    """
+    Return (Dict[str, Any]): the users.db columns of user data from a Telegram callback.
+    """
+    return {
+        'username': user_data.get('username'),
+        'first_name': user_data.get('first_name'),
+        'last_name': user_data.get('last_name'),
+        'language_code': user_data.get('language_code'),
+        'is_bot': user_data.get('is_bot', False),
+        'is_active': True,
+        'blocked_at': None,
+    }
+
+
+def choice_record(choice: str, keywords: Optional[Union[str, List[str]]] = None) -> Dict[str, Any]:
+    """
+    Return (Dict[str, Any]): the users.db columns of a news choice and its keywords.
+    """
+    record: Dict[str, Any] = {'news_choice': choice}
+    if choice == "news_keyword" and keywords:
+        record['news_keywords'] = keywords if isinstance(keywords, str) else ",".join(keywords)
+    return record
 
-        user, created = UserDB.get_or_create(user_id=user_data['user_id'])
-        user.username = user_data.get('username')
-        user.first_name = user_data.get('first_name')
-        user.last_name = user_data.get('last_name')
-        user.language_code = user_data.get('language_code')
-        user.is_bot = user_data.get('is_bot', False)
 
-        user.save()
+def upsert_users(records: Dict[int, Dict[str, Any]]) -> int:
+    """
+    Writes coalesced user updates as batched upserts (INSERT ... ON CONFLICT DO UPDATE) in one transaction.
+    Records with the same set of columns go into the same multi-row statement;
+    only the given columns of existing users are overwritten.
 
-        logger.info(f"User {user.user_id} saved to users.db. Created: {created}")
+    Args:
+        records (Dict[int, Dict[str, Any]]): Changed columns per Telegram user id.
 
-    except Exception as e:
-        logger.error(f"Error saving user to users.db: {e}\n{traceback.format_exc()}")
+    Returns:
+        int: Number of written users.
+    """
+    groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+    for user_id, fields in records.items():
+        columns = tuple(sorted(fields))
+        groups.setdefault(columns, []).append({'user_id': user_id, **fields})
+
+    with user_db.atomic():
+        for columns, rows in groups.items():
+            preserve = [getattr(UserDB, column) for column in columns]
+            # Stay below the SQLite limit of bound variables per statement
+            for batch in chunked(rows, max(1, 900 // (len(columns) + 1))):
+                query = UserDB.insert_many(batch)
+                if preserve:
+                    query = query.on_conflict(conflict_target=[UserDB.user_id], preserve=preserve)
+                else:
+                    query = query.on_conflict_ignore()
+                query.execute()
+    return len(records)
+
+
+def profile_from_row(user: UserDB) -> UserProfile:
+    """
+    Return (UserProfile): the cached part of a users.db row.
+    """
+    return UserProfile(user.user_id, user.language_code, user.news_choice, user.news_keywords)
 
 
-def save_user_choice(user_id: int, choice: str, keywords: Optional[Union[str, List[str]]] = None) -> None:
+def get_user_profile(user_id: int) -> UserProfile:
     """
-    Saves or updates user choice (all news or news by keyword) in the userdb database.
+    Return (UserProfile): language, news choice and keywords of the user, read with one projection query.
+    An unknown user gets the default profile (English, no choice).
 
     Args:
         user_id (int): Telegram user id.
-        choice (str): Type of format news, which user was selected (all news or news by keyword).
-        keywords (Optional[str]): If choice is news by keyword. The keywords that the user selected.
-
-    Return:
-        None
     """
-    try:
-        if user_db.is_closed():
-            user_db.connect()
-
-        user, created = UserDB.get_or_create(user_id=user_id)
-        user.news_choice = choice
-
-        if choice == "news_keyword" and keywords:
-            user.news_keywords = keywords
-
-        user.save()
+    row = (UserDB
+           .select(UserDB.language_code, UserDB.news_choice, UserDB.news_keywords)
+           .where(UserDB.user_id == user_id)
+           .tuples()
+           .first())
+    if row is None:
+        return UserProfile(user_id)
+    return UserProfile(user_id, *row)
 
-        logger.info(f"Saved choice '{choice}' for user {user_id} with keywords if is: {keywords} to users.db")
 
-    except Exception as e:
-        logger.error(f"Error saving user choice to users.db: {e}")
+def deactivate_users(user_ids: Iterable[int]) -> int:
+    """
+    Marks users who blocked the bot or deleted their account as inactive, in one statement.
 
+    Args:
+        user_ids (Iterable[int]): Telegram user ids.
 
-@print_lang_result
-def get_user_language(user_id: int) -> str:
+    Returns:
+        int: Number of deactivated users.
     """
-    Return (str): user language from userdb.
+    user_ids = list(user_ids)
+    if not user_ids:
+        return 0
+    with user_db.atomic():
+        count = (UserDB
+                 .update(is_active=False, blocked_at=datetime.now())
+                 .where(UserDB.user_id.in_(user_ids) & (UserDB.is_active == True))  # noqa: E712
+                 .execute())
+    logger.info(f"Deactivated {count} unreachable users")
+    return count
+
+
+def reactivate_user(user_id: int) -> None:
+    """
+    Marks a user as active again, for example when they send /start after unblocking the bot.
 
     Args:
         user_id (int): Telegram user id.
-
-    Returns:
-        (str): user language
     """
     try:
-        user = UserDB.get(UserDB.user_id == user_id)
-        return user.language_code or "en"
-    except UserDB.DoesNotExist: # type: ignore
-        return "en"
+        count = (UserDB
+                 .update(is_active=True, blocked_at=None)
+                 .where((UserDB.user_id == user_id) & (UserDB.is_active == False))  # noqa: E712
+                 .execute())
+        if count:
+            logger.info(f"User {user_id} reactivated")
+    except Exception as e:
+        logger.error(f"Error reactivating user {user_id}: {e}")
 
 
-def get_user_news_settings(user_id: int) -> Union[Tuple[str, List[str]], Tuple[None, None]]:
+def get_distinct_keywords() -> List[str]:
     """
-    Return (str): type of format news, which user was selected (all news or news by keyword).
+    Return (List[str]): every distinct keyword of active keyword subscribers, read with one projection query.
+    """
+    keywords = set()
+    query = (UserDB
+             .select(UserDB.news_keywords)
+             .where(
+                 (UserDB.news_choice == "news_keyword") &
+                 (UserDB.news_keywords.is_null(False)) &
+                 (UserDB.is_active == True)  # noqa: E712
+             )
+             .distinct()
+             .tuples())
+    for (news_keywords,) in query:
+        keywords.update(k.strip().lower() for k in news_keywords.split(",") if k.strip())
+    return sorted(keywords)
+
+
+def iter_user_batches(batch_size: int = 1000) -> Iterator[List[Tuple[int, Optional[str], Optional[str], Optional[str]]]]:
+    """
+    Yields active users in pages using keyset pagination over the primary key, so memory does not
+    depend on the number of users and every page is an indexed range scan.
+    Users who blocked the bot are skipped.
 
     Args:
-        user_id (int): Telegram user id.
+        batch_size (int): Number of users in one page.
 
     Returns:
-        Tuple[Optional[str], Optional[str]]: A tuple containing:
-            - news_choice (str or None): The type of news format selected by the user ('all news' or 'news_keyword').
-            - news_keywords (str or None): The keywords selected by the user if choice is 'news_keyword'.
-            None if not set or user does not exist.
+        Iterator[List[Tuple[int, Optional[str], Optional[str], Optional[str]]]]:
+            Pages of (user_id, news_choice, language_code, news_keywords) tuples.
     """
-    try:
-        user = UserDB.get(UserDB.user_id == user_id)
-        return user.news_choice, user.news_keywords
-    except UserDB.DoesNotExist: # type: ignore
-        return None, None
+    last_id: Optional[int] = None
+    while True:
+        query = (UserDB
+                 .select(UserDB.user_id, UserDB.news_choice, UserDB.language_code, UserDB.news_keywords)
+                 .where(UserDB.is_active == True))  # noqa: E712
+        if last_id is not None:
+            query = query.where(UserDB.user_id > last_id)
+        page = list(query.order_by(UserDB.user_id).limit(batch_size).tuples())
+        if not page:
+            return
+        yield page
+        last_id = page[-1][0]
 
 if __name__ == "__main__":
     initialize_user_db()
@@ -1,16 +1,103 @@
 import os
+import sqlite3
+import threading
+from typing import Dict, List
+
+from decouple import config
 from peewee import SqliteDatabase
 
-def init_database(db_name: str) -> SqliteDatabase:
+from utils.logger_config import logger
+
+SQLITE_CACHE_SIZE_KB: int = config('SQLITE_CACHE_SIZE_KB', default=65536, cast=int)
+SQLITE_MMAP_SIZE: int = config('SQLITE_MMAP_SIZE', default=268435456, cast=int)
+SQLITE_BUSY_TIMEOUT_MS: int = config('SQLITE_BUSY_TIMEOUT_MS', default=5000, cast=int)
+
+SQLITE_PRAGMAS: Dict[str, object] = {
+    'journal_mode': 'wal',  # readers and the writer don't block each other
+    'synchronous': 'normal',  # safe with WAL, one fsync per checkpoint instead of per commit
+    'cache_size': -SQLITE_CACHE_SIZE_KB,  # negative value is in KiB
+    'mmap_size': SQLITE_MMAP_SIZE,
+    'busy_timeout': SQLITE_BUSY_TIMEOUT_MS,
+    'foreign_keys': 1,
+}
+
+
+
+class TrackedSqliteDatabase(SqliteDatabase):
+    """
+    SqliteDatabase that remembers the connection opened on every thread (event loop, reader and
+    writer pools, asyncio.to_thread workers), so close_databases can close them all at shutdown.
+    Connections are still used only by the thread that opened them.
+    """
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = super()._connect()
+        with self._connections_lock:
+            self._connections.append(conn)
+        return conn
+
+    def close_all(self) -> int:
+        """
+        Closes the connections of every thread; call it once the worker threads are stopped.
+
+        Returns:
+            int: Number of closed connections.
+        """
+        if not self.is_closed():
+            self.close()
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        return len(connections)
+
+
+databases: List[TrackedSqliteDatabase] = []
+
+def init_database(db_name: str) -> TrackedSqliteDatabase:
     """
     Initializes and returns an SQLite database object.
 
+    Connections are long-lived: each thread opens its own connection on first use and keeps it,
+    configured with WAL, synchronous=NORMAL, a sized page cache, mmap and busy_timeout.
+    Open and close them once with open_databases and close_databases.
+
     Args:
         db_name (str): The name of the database file (for example, 'news.db').
 
     Returns:
-        SQLiteDatabase: The database object associated with the specified file.
+        TrackedSqliteDatabase: The database object associated with the specified file.
     """
     base_dir = os.path.dirname(__file__)
     db_path  = os.path.join(base_dir, db_name)
-    return SqliteDatabase(db_path)
\ No newline at end of file
+    database = TrackedSqliteDatabase(
+        db_path,
+        pragmas=SQLITE_PRAGMAS,
+        timeout=SQLITE_BUSY_TIMEOUT_MS / 1000,
+        # Lets close_databases close the connections of the pool threads from the main thread
+        check_same_thread=False,
+    )
+    databases.append(database)
+    return database
+
+def open_databases() -> None:
+    """
+    Opens the connections of the current thread to every database created by init_database.
+    """
+    for database in databases:
+        database.connect(reuse_if_open=True)
+        logger.info(f"Connected to {os.path.basename(database.database)}")
+
+def close_databases() -> None:
+    """
+    Closes the connections of all threads to every database created by init_database.
+    Call it after the database thread pools are shut down (see repository.shutdown_repository).
+    """
+    for database in databases:
+        closed = database.close_all()
+        if closed:
+            logger.info(f"{closed} connections to {os.path.basename(database.database)} closed")
@@ -0,0 +1,137 @@
+"""
+Asynchronous data-access layer for handlers and middleware.
+
+SQLite I/O never runs on the event loop: reads go to a small pool of reader threads
+and writes go to one dedicated writer thread, which serializes them as SQLite allows
+only one writer at a time. Every thread keeps its own long-lived connection.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, TypeVar, Union
+
+import asyncio
+from decouple import config
+
+from db_peewee.db_users_class import choice_record, get_user_profile, reactivate_user, upsert_users, user_record
+from db_peewee.user_write_buffer import UserWriteBuffer
+from utils.news_sort import get_all_daily, get_key_daily
+from utils.user_cache import UserProfile, user_cache
+
+DB_READER_THREADS: int = config('DB_READER_THREADS', default=4, cast=int)
+
+T = TypeVar('T')
+
+_reader = ThreadPoolExecutor(max_workers=DB_READER_THREADS, thread_name_prefix="db-reader")
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-writer")
+
+
+async def run_read(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+        Run a synchronous database read on the reader thread pool.
+
+        Args:
+            func (Callable[..., T]): Function doing the read.
+            *args (Any): Positional arguments of func.
+            **kwargs (Any): Keyword arguments of func.
+
+        Returns:
+            T: The result of func.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_reader, partial(func, *args, **kwargs))
+
+
+async def run_write(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+        Run a synchronous database write on the single writer thread.
+
+        Args:
+            func (Callable[..., T]): Function doing the write.
+            *args (Any): Positional arguments of func.
+            **kwargs (Any): Keyword arguments of func.
+
+        Returns:
+            T: The result of func.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_writer, partial(func, *args, **kwargs))
+
+
+async def _write_users(records: Dict[int, Dict[str, Any]]) -> int:
+    return await run_write(upsert_users, records)
+
+
+user_writes = UserWriteBuffer(_write_users)
+
+
+async def fetch_user_profile(user_id: int) -> UserProfile:
+    """
+        Return the profile of the user from user_cache, reading users.db only on a miss.
+
+        Args:
+            user_id (int): Telegram user id.
+
+        Returns:
+            UserProfile: Language, news choice and keywords; the default profile if the user is unknown.
+    """
+    profile = user_cache.get(user_id)
+    if profile is not None:
+        return profile
+    generation = user_cache.generation
+    profile = user_writes.overlay(await run_read(get_user_profile, user_id))
+    user_cache.put(profile, generation)
+    return profile
+
+
+async def fetch_user_language(user_id: int) -> str:
+    """
+        Return (str): user language, "en" if the user is unknown.
+    """
+    return (await fetch_user_profile(user_id)).language_code
+
+
+async def store_user(user_data: Dict[str, Any]) -> None:
+    """
+        Save or update user data from a Telegram callback through the write-behind buffer.
+    """
+    user_writes.start()
+    user_writes.submit(user_data['user_id'], user_record(user_data))
+
+
+async def store_user_choice(user_id: int, choice: str, keywords: Optional[Union[str, List[str]]] = None) -> None:
+    """
+        Save or update the news choice of the user through the write-behind buffer.
+    """
+    user_writes.start()
+    user_writes.submit(user_id, choice_record(choice, keywords))
+
+
+async def activate_user(user_id: int) -> None:
+    """
+        Mark a user who was deactivated after blocking the bot as active again.
+    """
+    await run_write(reactivate_user, user_id)
+
+
+async def fetch_all_daily(lang_code: str) -> List[str]:
+    """
+        Return (List[str]): today's news in the language, formatted with links.
+    """
+    return await run_read(get_all_daily, lang_code)
+
+
+async def fetch_key_daily(keys: List[str], lang_code: str) -> List[str]:
+    """
+        Return (List[str]): today's news matching the keywords in the language, formatted with links.
+    """
+    return await run_read(get_key_daily, keys, lang_code=lang_code)
+
+
+async def shutdown_repository() -> None:
+    """
+        Flush buffered user writes, wait for queued writes and stop the database threads.
+    """
+    await user_writes.stop()
+    _writer.shutdown(wait=True)
+    _reader.shutdown(wait=True)
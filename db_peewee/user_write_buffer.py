@@ -0,0 +1,157 @@
+"""
+Write-behind buffer for user profile writes.
+
+Handlers don't write users.db on every click: updates are coalesced per user_id in memory
+and flushed as batched upserts in one transaction every USER_WRITE_FLUSH_MS milliseconds,
+or as soon as USER_WRITE_BATCH users are pending, and once more on shutdown. After a failed
+flush the interval doubles, up to USER_WRITE_MAX_BACKOFF seconds, until a flush succeeds.
+Reads see pending updates through UserWriteBuffer.overlay and the user cache.
+"""
+
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import asyncio
+from decouple import config
+
+from utils.logger_config import logger
+from utils.user_cache import UserProfile, user_cache
+
+USER_WRITE_FLUSH_MS: int = config('USER_WRITE_FLUSH_MS', default=200, cast=int)
+USER_WRITE_BATCH: int = config('USER_WRITE_BATCH', default=500, cast=int)
+USER_WRITE_MAX_BACKOFF: float = config('USER_WRITE_MAX_BACKOFF', default=30.0, cast=float)
+
+PROFILE_FIELDS = ("language_code", "news_choice", "news_keywords")
+
+
+class UserWriteBuffer:
+    """
+        Coalesces user updates and flushes them in batches.
+
+        Attributes:
+            flush_interval (float): Seconds between flushes.
+            max_pending (int): Number of pending users that triggers an early flush.
+            flushed (int): Number of user rows written so far.
+            submitted (int): Number of updates submitted so far.
+            failures (int): Consecutive failed flushes, 0 after a successful one.
+    """
+    def __init__(
+            self,
+            write: Callable[[Dict[int, Dict[str, Any]]], Awaitable[Any]],
+            flush_interval_ms: int = USER_WRITE_FLUSH_MS,
+            max_pending: int = USER_WRITE_BATCH
+    ) -> None:
+        """
+            Args:
+                write (Callable[[Dict[int, Dict[str, Any]]], Awaitable[Any]]):
+                    Coroutine function writing a batch, e.g. upsert_users on the writer thread.
+                flush_interval_ms (int): Milliseconds between flushes.
+                max_pending (int): Number of pending users that triggers an early flush.
+        """
+        self.flush_interval: float = flush_interval_ms / 1000
+        self.max_pending: int = max(1, max_pending)
+        self.flushed: int = 0
+        self.submitted: int = 0
+        self.failures: int = 0
+        self._write = write
+        self._pending: Dict[int, Dict[str, Any]] = {}
+        self._inflight: Dict[int, Dict[str, Any]] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._closing: bool = False
+        self._flush_lock = asyncio.Lock()
+
+    def submit(self, user_id: int, fields: Dict[str, Any]) -> None:
+        """
+            Queue changed columns of a user; later updates of the same column win.
+            The cached profile is updated at once, so the user sees the change before the flush.
+        """
+        self._pending.setdefault(user_id, {}).update(fields)
+        self.submitted += 1
+
+        # Not a lookup of the user, so it must not count in the cache stats or refresh the entry
+        profile = user_cache.peek(user_id)
+        if profile is not None:
+            user_cache.write_through(self.overlay(profile))
+        else:
+            user_cache.invalidate(user_id)
+
+        # While flushes fail, a full buffer waits for the backoff instead of retrying at once
+        if len(self._pending) >= self.max_pending and not self.failures:
+            self._wakeup.set()
+
+    def overlay(self, profile: UserProfile) -> UserProfile:
+        """
+            Return (UserProfile): the profile with the pending, not yet flushed updates of the user applied.
+        """
+        fields = {**self._inflight.get(profile.user_id, {}), **self._pending.get(profile.user_id, {})}
+        if not fields or not any(name in fields for name in PROFILE_FIELDS):
+            return profile
+        values = {name: fields.get(name, getattr(profile, name)) for name in PROFILE_FIELDS}
+        return UserProfile(profile.user_id, **values)
+
+    def start(self) -> None:
+        """
+            Start the background flush task on the running event loop.
+        """
+        if self._task is None:
+            self._closing = False
+            self._task = asyncio.create_task(self._run())
+
+    def _delay(self) -> float:
+        """
+            Return (float): seconds until the next flush, doubled by every consecutive failure.
+        """
+        if not self.failures:
+            return self.flush_interval
+        return min(self.flush_interval * 2 ** min(self.failures, 16), max(USER_WRITE_MAX_BACKOFF, self.flush_interval))
+
+    async def _run(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._delay())
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        """
+            Write every pending update in one batch.
+
+            Returns:
+                int: Number of written users.
+        """
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, {}
+            # Still visible to overlay until the transaction is committed
+            self._inflight = batch
+            try:
+                await self._write(batch)
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"Error flushing {len(batch)} user updates, will retry in {self._delay():.1f}s: {e}")
+                # Updates submitted during the failed write are newer and win
+                for user_id, fields in batch.items():
+                    self._pending[user_id] = {**fields, **self._pending.get(user_id, {})}
+                return 0
+            finally:
+                self._inflight = {}
+            self.failures = 0
+            self.flushed += len(batch)
+            logger.debug(f"Flushed {len(batch)} user updates")
+            return len(batch)
+
+    async def stop(self) -> None:
+        """
+            Stop the flush task and write what is still pending.
+        """
+        # The task is not cancelled: a batch already handed to the writer thread must not be lost
+        self._closing = True
+        self._wakeup.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        await self.flush()
+        logger.info(f"User write buffer stopped: {self.submitted} updates written as {self.flushed} rows")
@@ -1,27 +1,48 @@
+#Imported first: the startup timing report is measured from here.
+from utils.startup import startup
+
 import asyncio
 
+from db_peewee.db_fsm_class import initialize_fsm_db
+from db_peewee.db_news_class import initialize_news_db
 from db_peewee.db_users_class import initialize_user_db
+from db_peewee.init_database import close_databases, open_databases
+from db_peewee.repository import shutdown_repository
 from telegram_bot.create_bot import bot, dp, scheduler
 from telegram_bot.handlers import routers
 from telegram_bot.middlewares.news_middleware import UserLanguageMiddleware
+from telegram_bot.middlewares.startup_middleware import StartupTimingMiddleware
+from utils.http_client import close_http_session
 from utils.logger_config import logger
 from utils.scheduled_jobs import scheduled_jobs
-
-from utils.scheduled_jobs.translate_to_lang_db import fill_translated_news
+from utils.scheduled_jobs.auto_send_news import resume_pending_broadcasts
+from utils.scheduled_jobs.pipeline import news_pipeline
+from utils.scheduled_jobs.poller import news_poller
 
 """
-At the first launch main, initializes the user database and the news database, 
-queries the current available news, translates it into the installed languages, 
-and creates a database for each language. 
-Only after that, asynchronous operation of the telegram bot will be started.
-In the process, it updates the news databases and sends the latest news 
+On launch, main creates the user and news databases and starts polling right away.
+Querying the current available news and translating it into the installed languages
+runs as a background warm-up; until it finishes, handlers tell users that fresh news
+are still loading (see utils.startup).
+In the process, it updates the news databases and sends the latest news
 to the user in the language of his choice.
 """
-initialize_user_db()
-fill_translated_news() #It takes data from the news.db. In English, it translates this data from the database into languages that are supported by the script.(Translates  ~10-15 news items * (*lang), now there are 7 languages.)
 
 async def main() -> None:
     logger.info("Main starting")
+    startup.mark("imports_done")
+
+    #Long-lived connections of the event loop thread, closed once on shutdown.
+    open_databases()
+    #Local schema checks only, fast; network work is left to the warm-up.
+    initialize_user_db()
+    initialize_news_db()
+    initialize_fsm_db()
+
+    #Translation workers picking up news as soon as they are ingested.
+    news_pipeline.start()
+    #Between the digests, sources are polled as often as their news flow and the API quota allow.
+    news_poller.start()
 
     #A list of schedulers performed 2 times a day.
     for func, trigger, job_id, job_name in scheduled_jobs:
@@ -30,13 +51,33 @@ async def main() -> None:
 
     scheduler.start()
 
+    #Fetching and translating the current news (~10-15 items * languages) runs in the background.
+    warmup_task = startup.start_warmup([news_pipeline.warm_up])
+
+    #Newsletters interrupted by a restart are finished from the outbox in the background.
+    resume_task = asyncio.create_task(resume_pending_broadcasts())
+
+    dp.update.outer_middleware(StartupTimingMiddleware())
     dp.update.middleware(UserLanguageMiddleware())
+    dp.startup.register(lambda: startup.mark("polling_started"))
 
     for router in routers:
         dp.include_router(router)
 
-    await bot.delete_webhook(drop_pending_updates=True)
-    await dp.start_polling(bot)
+    try:
+        await bot.delete_webhook(drop_pending_updates=True)
+        await dp.start_polling(bot)
+    finally:
+        #Background work still using the database threads is stopped before they are shut down.
+        for task in (warmup_task, resume_task):
+            task.cancel()
+        await asyncio.gather(warmup_task, resume_task, return_exceptions=True)
+        await news_poller.stop()
+        await news_pipeline.stop()
+        await close_http_session()
+        await bot.session.close()
+        await shutdown_repository()
+        close_databases()
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
@@ -0,0 +1,177 @@
+"""
+FSM storage for aiogram backed by fsm.db.
+
+States live in a bounded in-memory LRU cache in front of SQLite. Changes are written
+to the cache at once and persisted in batches by a background task, abandoned states
+expire after FSM_STATE_TTL seconds, so memory stays bounded and a restart keeps
+the place of a user in a conversation. Conversations without a stored state are cached
+too. The storage is closed by the dispatcher on shutdown.
+"""
+
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+import json
+import time
+
+import asyncio
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, DefaultKeyBuilder, KeyBuilder, StateType, StorageKey
+from decouple import config
+
+from db_peewee.db_fsm_class import FSMRecord, delete_expired_fsm, initialize_fsm_db, load_fsm_record, save_fsm_records
+from db_peewee.repository import run_read, run_write
+from utils.logger_config import logger
+
+FSM_CACHE_SIZE: int = config('FSM_CACHE_SIZE', default=5000, cast=int)
+FSM_STATE_TTL: int = config('FSM_STATE_TTL', default=86400, cast=int)
+FSM_FLUSH_MS: int = config('FSM_FLUSH_MS', default=500, cast=int)
+FSM_CLEANUP_INTERVAL: int = config('FSM_CLEANUP_INTERVAL', default=3600, cast=int)
+
+
+class _Entry:
+    """
+        Cached FSM record of one conversation.
+    """
+    __slots__ = ("state", "data", "updated_at", "expires")
+
+    def __init__(self, state: Optional[str], data: Dict[str, Any], updated_at: datetime, ttl: int) -> None:
+        self.state = state
+        self.data = data
+        self.updated_at = updated_at
+        self.expires = time.monotonic() + ttl - (datetime.now() - updated_at).total_seconds()
+
+    def record(self) -> FSMRecord:
+        return self.state, json.dumps(self.data, ensure_ascii=False), self.updated_at
+
+
+class SQLiteStorage(BaseStorage):
+    """
+        aiogram storage persisting states and data in fsm.db.
+
+        Attributes:
+            cache_size (int): Maximum number of conversations kept in memory.
+            ttl (int): Seconds after the last change when a state is considered abandoned.
+            flush_interval (float): Seconds between batched writes.
+    """
+    def __init__(
+            self,
+            cache_size: int = FSM_CACHE_SIZE,
+            ttl: int = FSM_STATE_TTL,
+            flush_interval_ms: int = FSM_FLUSH_MS,
+            key_builder: Optional[KeyBuilder] = None
+    ) -> None:
+        self.cache_size: int = max(1, cache_size)
+        self.ttl: int = ttl
+        self.flush_interval: float = flush_interval_ms / 1000
+        self.key_builder: KeyBuilder = key_builder or DefaultKeyBuilder(with_destiny=True)
+        self._cache: "OrderedDict[str, _Entry]" = OrderedDict()
+        # Changed records not yet written; kept apart from the cache so eviction never loses a change
+        self._dirty: Dict[str, _Entry] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._closing: bool = False
+        self._initialized: bool = False
+        self._init_lock = asyncio.Lock()
+
+    async def _entry(self, key: StorageKey) -> Optional[_Entry]:
+        storage_key = self.key_builder.build(key)
+        entry = self._dirty.get(storage_key) or self._cache.get(storage_key)
+        if entry is None:
+            await self._initialize()
+            record = await run_read(load_fsm_record, storage_key)
+            # A write during the read is newer than the loaded row
+            entry = self._dirty.get(storage_key) or self._cache.get(storage_key)
+            if entry is None and record is None:
+                # Cached as an empty state, so users without a conversation don't cost a read per message
+                entry = _Entry(None, {}, datetime.now(), self.ttl)
+            elif entry is None:
+                state, data, updated_at = record
+                entry = _Entry(state, json.loads(data), updated_at, self.ttl)
+        if entry.expires < time.monotonic():
+            self._cache.pop(storage_key, None)
+            return None
+        self._remember(storage_key, entry)
+        return entry
+
+    def _remember(self, storage_key: str, entry: _Entry) -> None:
+        self._cache[storage_key] = entry
+        self._cache.move_to_end(storage_key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def _change(self, key: StorageKey, state: Optional[str], data: Dict[str, Any]) -> None:
+        storage_key = self.key_builder.build(key)
+        entry = _Entry(state, data, datetime.now(), self.ttl)
+        self._remember(storage_key, entry)
+        self._dirty[storage_key] = entry
+        await self._start()
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        entry = await self._entry(key)
+        await self._change(
+            key,
+            state.state if isinstance(state, State) else state,
+            entry.data if entry else {}
+        )
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        entry = await self._entry(key)
+        return entry.state if entry else None
+
+    async def set_data(self, key: StorageKey, data: Dict[str, Any]) -> None:
+        entry = await self._entry(key)
+        await self._change(key, entry.state if entry else None, data.copy())
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        entry = await self._entry(key)
+        return entry.data.copy() if entry else {}
+
+    async def _initialize(self) -> None:
+        if self._initialized:
+            return
+        # Concurrent first calls wait until the table exists
+        async with self._init_lock:
+            if not self._initialized:
+                await run_write(initialize_fsm_db)
+                self._initialized = True
+
+    async def _start(self) -> None:
+        if self._task is None and not self._closing:
+            await self._initialize()
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        last_cleanup = 0.0
+        while not self._closing:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+            if time.monotonic() - last_cleanup >= FSM_CLEANUP_INTERVAL:
+                last_cleanup = time.monotonic()
+                try:
+                    await run_write(delete_expired_fsm, datetime.now() - timedelta(seconds=self.ttl))
+                except Exception as e:
+                    logger.error(f"Error deleting abandoned FSM states: {e}")
+
+    async def flush(self) -> None:
+        """
+            Write every changed record to fsm.db in one transaction.
+        """
+        if not self._dirty:
+            return
+        batch, self._dirty = self._dirty, {}
+        try:
+            await run_write(save_fsm_records, {key: entry.record() for key, entry in batch.items()})
+        except Exception as e:
+            logger.error(f"Error saving {len(batch)} FSM states, will retry: {e}")
+            for key, entry in batch.items():
+                self._dirty.setdefault(key, entry)
+
+    async def close(self) -> None:
+        """
+            Stop the background task and write the remaining changes.
+        """
+        self._closing = True
+        if self._task is not None:
+            await self._task
+            self._task = None
+        await self.flush()
@@ -4,22 +4,22 @@ from aiogram import Router
 from aiogram.filters import Command
 from aiogram.types import Message
 
-from db_peewee.db_users_class import get_user_news_settings
+from utils.user_cache import UserProfile
 
 keywords_router = Router()
 
 @keywords_router.message(Command(commands=["selected_keyword"]))
-async def selected_keywords_command(message: Message) -> None:
+async def selected_keywords_command(message: Message, user_profile: UserProfile) -> None:
     """
         Outputs previously selected key values in /news_keyword
 
         Args:
             message (Message): The message object from the user.
+            user_profile (UserProfile): Profile injected by UserLanguageMiddleware.
 
         Returns:
             None
     """
-    user_id = message.from_user.id
-    news_choice, news_keywords = get_user_news_settings(user_id)
+    news_keywords = user_profile.news_keywords or ""
 
     await message.answer(news_keywords.replace(",", ", "))
\ No newline at end of file
@@ -2,9 +2,8 @@ from typing import Any, Dict
 
 from aiogram import F, Router
 from aiogram.types import CallbackQuery
-import asyncio
 
-from db_peewee.db_users_class import save_user_to_db
+from db_peewee.repository import store_user
 from telegram_bot.handlers.news_handlers import choose_news
 from telegram_bot.middlewares.call_second_router_middleware import CallSecondRouterMiddleware
 from utils.languages import SELECTED_LANGUAGE_MESSAGES
@@ -38,8 +37,7 @@ async def language_chosen(callback: CallbackQuery) -> None:
     }
     logger.info("The process of adding a user to the database:", user_data)
 
-    loop = asyncio.get_event_loop()
-    await loop.run_in_executor(None, save_user_to_db, user_data)
+    await store_user(user_data)
 
     await callback.message.answer(f"{SELECTED_LANGUAGE_MESSAGES.get(lang_code)}")
     await callback.answer()
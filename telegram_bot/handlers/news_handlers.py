@@ -6,26 +6,27 @@ from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery, Message
 import asyncio
 
-from db_peewee.db_users_class import get_user_language
-from db_peewee.db_users_class import save_user_choice
+from db_peewee.repository import fetch_all_daily, fetch_key_daily, fetch_user_language, store_user_choice
 from telegram_bot.FSM.fsm_news_keywords import NewsKeywordStates
 from telegram_bot.keyboards.news_keyboards import news_keyboard
 from utils.data_sort import split_messages
-from utils.languages import NEWS_QUESTION, ENTER_KEYWORDS_PROMPT, EMPTY_INPUT_RETRY, NO_FRESH_NEWS
+from utils.languages import NEWS_QUESTION, ENTER_KEYWORDS_PROMPT, EMPTY_INPUT_RETRY, NO_FRESH_NEWS, WARMING_UP
 from utils.logger_config import logger
-from utils.news_sort import get_all_daily, get_key_daily
+from utils.startup import startup
 
 news_choose_router = Router()
 
 @news_choose_router.callback_query(F.data.startswith("lang_"))
-async def choose_news(callback: CallbackQuery) -> None:
+async def choose_news(callback: CallbackQuery, lang_code: Optional[str] = None) -> None:
     """
         Handler for language selection callback queries starting with "lang_".
-        Retrieves the user's language from the database and sends a localized news question
+        Retrieves the user's language and sends a localized news question
         with a keyboard for further interaction.
 
         Args:
             callback (CallbackQuery): The callback query object from the user.
+            lang_code (Optional[str]): Optional language code; if not provided, read from the user cache.
+                CallSecondRouterMiddleware calls it without handler data, right after the language was saved.
 
         Returns:
             None
@@ -34,8 +35,8 @@ async def choose_news(callback: CallbackQuery) -> None:
 
     await asyncio.sleep(1)
 
-    user_id = callback.from_user.id
-    lang_code = get_user_language(user_id)
+    if lang_code is None:
+        lang_code = await fetch_user_language(callback.from_user.id)
     question = NEWS_QUESTION.get(lang_code, NEWS_QUESTION["en"])
     await callback.message.answer(
         question,
@@ -54,37 +55,38 @@ async def news_all(callback: CallbackQuery, lang_code: Optional[str] = None) ->
 
         Args:
             callback (CallbackQuery): The callback query object from the user.
-            lang_code (Optional[str]): Optional language code; if not provided, fetched from DB.
+            lang_code (Optional[str]): Optional language code; if not provided, read from the user cache.
 
         Returns:
             None
     """
     user_id = callback.from_user.id
-    lang_code = get_user_language(user_id)
+    if lang_code is None:
+        lang_code = await fetch_user_language(user_id)
 
-    save_user_choice(user_id, "news_all")
-    news_messages: List[str] = get_all_daily(lang_code=lang_code)
+    await store_user_choice(user_id, "news_all")
+    news_messages: List[str] = await fetch_all_daily(lang_code)
 
     await send_news(callback.message, news_messages, lang_code)
 
     await callback.answer()
 
 @news_all_router.message(Command(commands=["news_all"]))
-async def all_news_command(message: Message) -> None:
+async def all_news_command(message: Message, lang_code: str) -> None:
     """
         Processes the /news_all command, sends the user all the news in his language.
 
         Args:
             message (Message): The message object from the user.
+            lang_code (str): User language injected by UserLanguageMiddleware.
 
         Returns:
             None
     """
     user_id = message.from_user.id
-    lang_code = get_user_language(user_id)
 
-    save_user_choice(user_id, "news_all")
-    news_messages: List[str] = get_all_daily(lang_code=lang_code)
+    await store_user_choice(user_id, "news_all")
+    news_messages: List[str] = await fetch_all_daily(lang_code)
 
     await send_news(message, news_messages, lang_code)
 
@@ -93,7 +95,7 @@ async def all_news_command(message: Message) -> None:
 news_keyword_router = Router()
 
 @news_keyword_router.callback_query(F.data == "news_keyword")
-async def ask_keywords(callback: CallbackQuery, state: FSMContext) -> None:
+async def ask_keywords(callback: CallbackQuery, state: FSMContext, lang_code: str) -> None:
     """
         Handler for callback query with data "news_keyword".
         Prompts the user to enter keywords for news filtering and sets FSM state.
@@ -101,18 +103,17 @@ async def ask_keywords(callback: CallbackQuery, state: FSMContext) -> None:
         Args:
             callback (CallbackQuery): The callback query object from the user.
             state (FSMContext): FSM context to manage user state.
+            lang_code (str): User language injected by UserLanguageMiddleware.
 
         Returns:
             None
     """
-    user_id = callback.from_user.id
-    lang_code = get_user_language(user_id)
     await callback.message.answer(f"{ENTER_KEYWORDS_PROMPT.get(lang_code)}")
     await state.set_state(NewsKeywordStates.waiting_for_keywords)
     await callback.answer()
 
 @news_keyword_router.message(Command(commands=["news_keyword"]))
-async def key_words_command(message: Message, state: FSMContext) -> None:
+async def key_words_command(message: Message, state: FSMContext, lang_code: str) -> None:
     """
         Processes the command to enter keywords.
         Sends the user an invitation to enter keywords and puts the FSM in the standby state.
@@ -120,19 +121,17 @@ async def key_words_command(message: Message, state: FSMContext) -> None:
         Args:
             message (Message): The message object from the user.
             state (FSMContext): The context of the state machine for the current user.
+            lang_code (str): User language injected by UserLanguageMiddleware.
 
         Returns:
             None
     """
-    user_id = message.from_user.id
-    lang_code = get_user_language(user_id)
-
     await message.answer(ENTER_KEYWORDS_PROMPT.get(lang_code))
     await state.set_state(NewsKeywordStates.waiting_for_keywords)
 
 
 @news_keyword_router.message(NewsKeywordStates.waiting_for_keywords)
-async def process_keywords(message: Message, state: FSMContext) -> None:
+async def process_keywords(message: Message, state: FSMContext, lang_code: str) -> None:
     """
         Handler for processing user-entered keywords while in the waiting_for_keywords FSM state.
         Validates input, saves user choice, fetches news filtered by keywords,
@@ -141,21 +140,21 @@ async def process_keywords(message: Message, state: FSMContext) -> None:
         Args:
             message (Message): Incoming message with keywords.
             state (FSMContext): FSM context to manage user state.
+            lang_code (str): User language injected by UserLanguageMiddleware.
 
         Returns:
             None
         """
     user_id = message.from_user.id
-    lang_code = get_user_language(user_id)
 
     keys: List[str] = [k.strip() for k in message.text.split(",") if k.strip()]
     if not keys:
         await message.answer(f"{EMPTY_INPUT_RETRY.get(lang_code)}")
         return
 
-    save_user_choice(user_id, "news_keyword", keywords=",".join(keys))
+    await store_user_choice(user_id, "news_keyword", keywords=",".join(keys))
 
-    news_messages: List[str] = get_key_daily(*keys, lang_code=lang_code)
+    news_messages: List[str] = await fetch_key_daily(keys, lang_code)
 
     await send_news(message, news_messages, lang_code)
 
@@ -168,7 +167,8 @@ async def send_news(
                     ) -> None:
     """
         Sends the news to the user, breaking them down into convenient parts.
-        If there is no news, it sends a message about their absence.
+        If there is no news, it sends a message about their absence,
+        or that news are still loading if the startup warm-up has not finished.
 
         Args:
             answer_target (Message): The object of the message to which the text will be sent in response.
@@ -179,6 +179,9 @@ async def send_news(
             None
     """
     if not news_messages:
+        if not startup.ready:
+            await answer_target.answer(f"{WARMING_UP.get(lang_code, WARMING_UP['en'])}")
+            return
         await answer_target.answer(f"{NO_FRESH_NEWS.get(lang_code)}")
         return
 
@@ -2,6 +2,7 @@ from aiogram import Router
 from aiogram.filters import CommandStart
 from aiogram.types import Message
 
+from db_peewee.repository import activate_user
 from telegram_bot.keyboards.lang_keyboard import language_keyboard
 from utils.logger_config import logger
 
@@ -12,7 +13,8 @@ async def cmd_start(message: Message) -> None:
     """
         Handler for the /start command.
         Sends a greeting message and prompts the user to choose their language
-        using an inline keyboard.
+        using an inline keyboard. A user who was deactivated after blocking the bot
+        is marked active again.
 
         Args:
             message (Message): Incoming message with the /start command.
@@ -22,6 +24,9 @@ async def cmd_start(message: Message) -> None:
     """
 
     logger.info("Handler start_chosen called")
+
+    await activate_user(message.from_user.id)
+
     await message.answer(
         "Hello! Please choose your language: 🌐🧐",
         reply_markup=language_keyboard()
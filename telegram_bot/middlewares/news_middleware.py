@@ -3,15 +3,17 @@ from typing import Any, Awaitable, Callable, Dict
 from aiogram import BaseMiddleware
 from aiogram.types import TelegramObject
 
-from db_peewee.db_users_class import get_user_language
+from db_peewee.repository import fetch_user_profile
+from utils.user_cache import UserProfile
 
 class UserLanguageMiddleware(BaseMiddleware):
     """
-        Middleware to inject the user's language code into the handler's data dictionary.
+        Middleware to inject the user's profile and language code into the handler's data dictionary.
 
-        This middleware extracts the user ID from the incoming Telegram event,
-        retrieves the user's preferred language code from the database,
-        and adds it to the `data` dictionary passed to the handler.
+        This middleware extracts the user from the incoming Telegram event,
+        retrieves the user's profile from the user cache (users.db on a miss),
+        and adds it as `user_profile` and `lang_code` to the `data` dictionary passed to the handler,
+        so handlers don't query the database again.
         If the user is not found, it defaults to English ("en").
 
         Attributes:
@@ -25,7 +27,7 @@ class UserLanguageMiddleware(BaseMiddleware):
             data: Dict[str, Any]
     ) -> Any:
         """
-            Middleware call method that enriches handler data with user language.
+            Middleware call method that enriches handler data with the user profile and language.
 
             Args:
                 handler (Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]]):
@@ -36,11 +38,11 @@ class UserLanguageMiddleware(BaseMiddleware):
             Returns:
                 Any: The result of the handler execution.
         """
-        user = getattr(event, "from_user", None)
+        user = data.get("event_from_user") or getattr(event, "from_user", None)
         if user:
-            user_id = user.id
-            lang_code = get_user_language(user_id)
-            data["lang_code"] = lang_code
+            profile = await fetch_user_profile(user.id)
         else:
-            data["lang_code"] = "en"
+            profile = UserProfile(0)
+        data["user_profile"] = profile
+        data["lang_code"] = profile.language_code
         return await handler(event, data)
@@ -0,0 +1,35 @@
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from utils.startup import startup
+
+class StartupTimingMiddleware(BaseMiddleware):
+    """
+        Middleware recording the first update handled after startup, for the startup timing report.
+
+        Attributes:
+            None
+    """
+
+    async def __call__(
+            self,
+            handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+            event: TelegramObject,
+            data: Dict[str, Any]
+    ) -> Any:
+        """
+            Middleware call method that marks the first update and passes the event on.
+
+            Args:
+                handler (Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]]):
+                    The next handler in the middleware chain.
+                event (TelegramObject): Incoming Telegram event (message, callback, etc.).
+                data (Dict[str, Any]): Data dictionary to pass to the handler.
+
+            Returns:
+                Any: The result of the handler execution.
+        """
+        startup.mark_first_update()
+        return await handler(event, data)
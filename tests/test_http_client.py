@@ -0,0 +1,133 @@
+"""
+Tests of the shared HTTP client and the RapidAPI source against a local aiohttp stand-in
+server serving a recorded RapidAPI payload, reached through RAPID_BASE_URL.
+"""
+
+import os
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+FIXTURE = Path(__file__).parent / "fixtures" / "rapidapi_cryptodaily.json"
+
+# Read by decouple when the modules are imported; the environment wins over .env
+os.environ.setdefault("RAPID_KEY", "test-key")
+os.environ["proxy"] = ""
+
+from utils import http_client  # noqa: E402
+from utils.news_sources import rapidapi  # noqa: E402
+from utils.news_sources.rapidapi import RapidAPISource  # noqa: E402
+
+
+class RapidAPIStandIn:
+    """
+        Stand-in for the RapidAPI endpoint: answers the queued statuses first, then the recorded payload.
+    """
+    def __init__(self, statuses=(), retry_after: str = "0", etag: str = '"v1"') -> None:
+        self.statuses = list(statuses)
+        self.retry_after = retry_after
+        self.etag = etag
+        self.requests = []
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.requests.append(request)
+        if self.statuses:
+            return web.Response(status=self.statuses.pop(0), headers={"Retry-After": self.retry_after})
+        if request.headers.get("If-None-Match") == self.etag:
+            return web.Response(status=304, headers={"ETag": self.etag})
+        return web.Response(body=FIXTURE.read_bytes(), content_type="application/json", headers={"ETag": self.etag})
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/v1/{endpoint}", self.handle)
+        return app
+
+
+class RapidAPISourceTest(unittest.IsolatedAsyncioTestCase):
+    async def start(self, stand_in: RapidAPIStandIn) -> None:
+        self.server = TestServer(stand_in.app())
+        await self.server.start_server()
+        patcher = mock.patch.object(rapidapi, "RAPID_BASE_URL", str(self.server.make_url("")))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def asyncTearDown(self) -> None:
+        await http_client.close_http_session()
+        await self.server.close()
+
+    async def test_retries_503_then_returns_recorded_payload(self) -> None:
+        stand_in = RapidAPIStandIn(statuses=[503])
+        await self.start(stand_in)
+        source = RapidAPISource("cryptodaily")
+
+        response = await http_client.fetch(source.url(), headers=source.headers())
+
+        self.assertEqual(len(stand_in.requests), 2)
+        self.assertEqual(stand_in.requests[0].headers["x-rapidapi-key"], os.environ["RAPID_KEY"])
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.body, FIXTURE.read_bytes())
+
+    async def test_source_parses_recorded_payload(self) -> None:
+        stand_in = RapidAPIStandIn()
+        await self.start(stand_in)
+
+        result = await RapidAPISource("cryptodaily").fetch()
+
+        self.assertEqual([item.url for item in result.items], [
+            "https://cryptodaily.co.uk/2025/06/bitcoin-etf-inflows-record-week",
+            "https://cryptodaily.co.uk/2025/06/ethereum-pectra-upgrade-date",
+        ])
+        first = result.items[0]
+        self.assertEqual(first.source, "rapidapi:cryptodaily")
+        self.assertEqual(first.created_at.isoformat(), "2025-06-21T06:05:12+00:00")
+        self.assertIsNone(result.items[1].thumbnail)
+        self.assertEqual(result.etag, '"v1"')
+
+    async def test_metered_source_is_not_retried(self) -> None:
+        stand_in = RapidAPIStandIn(statuses=[503])
+        await self.start(stand_in)
+
+        with self.assertRaises(http_client.aiohttp.ClientResponseError):
+            await RapidAPISource("cryptodaily").fetch()
+
+        # Each attempt is a billed call, counted once by the daily quota
+        self.assertEqual(len(stand_in.requests), 1)
+
+    async def test_conditional_get_returns_not_modified(self) -> None:
+        stand_in = RapidAPIStandIn()
+        await self.start(stand_in)
+
+        result = await RapidAPISource("cryptodaily").fetch(etag='"v1"')
+
+        self.assertIsNone(result.items)
+        self.assertEqual(result.etag, '"v1"')
+        self.assertEqual(len(stand_in.requests), 1)
+
+    async def test_gives_up_after_retries(self) -> None:
+        stand_in = RapidAPIStandIn(statuses=[503, 503, 503])
+        await self.start(stand_in)
+
+        with self.assertRaises(http_client.aiohttp.ClientResponseError) as error:
+            await http_client.fetch(str(self.server.make_url("/v1/cryptodaily")), retries=2)
+
+        self.assertEqual(error.exception.status, 503)
+        self.assertEqual(len(stand_in.requests), 3)
+
+    async def test_retry_after_is_capped(self) -> None:
+        stand_in = RapidAPIStandIn(statuses=[429], retry_after="3600")
+        await self.start(stand_in)
+
+        started = time.monotonic()
+        with mock.patch.object(http_client, "HTTP_MAX_RETRY_AFTER", 0.1):
+            response = await http_client.fetch(str(self.server.make_url("/v1/cryptodaily")))
+
+        self.assertEqual(response.status, 200)
+        self.assertLess(time.monotonic() - started, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,349 @@
+"""
+Rate-limited broadcast engine for sending the newsletter to many chats.
+
+Telegram allows roughly 30 messages per second across all chats and about one message
+per second to the same chat. The engine combines a global token bucket with per-chat
+pacing, runs a fixed number of sender workers and re-queues jobs that hit
+TelegramRetryAfter or a transient network/server error, so a broadcast finishes in predictable time at the allowed rate.
+"""
+
+from typing import Any, AsyncIterable, Callable, Dict, List, Optional
+
+import asyncio
+import time
+
+from aiogram import Bot
+from aiogram.exceptions import (
+    TelegramAPIError, TelegramBadRequest, TelegramForbiddenError, TelegramNetworkError, TelegramRetryAfter,
+    TelegramServerError,
+)
+from decouple import config
+
+from utils.logger_config import logger
+
+BROADCAST_RATE: float = config('BROADCAST_RATE', default=28, cast=float)
+BROADCAST_BURST: int = config('BROADCAST_BURST', default=28, cast=int)
+BROADCAST_CHAT_INTERVAL: float = config('BROADCAST_CHAT_INTERVAL', default=1.0, cast=float)
+BROADCAST_CONCURRENCY: int = config('BROADCAST_CONCURRENCY', default=20, cast=int)
+BROADCAST_QUEUE_SIZE: int = config('BROADCAST_QUEUE_SIZE', default=100, cast=int)
+BROADCAST_MAX_RETRIES: int = config('BROADCAST_MAX_RETRIES', default=5, cast=int)
+BROADCAST_PROGRESS_EVERY: int = config('BROADCAST_PROGRESS_EVERY', default=500, cast=int)
+
+
+UNREACHABLE_CHAT_ERRORS = ("chat not found", "user is deactivated", "bot was blocked")
+
+
+def is_chat_unreachable(error: TelegramAPIError) -> bool:
+    """
+        Tells whether an error means the chat will never accept messages again
+        (the user blocked the bot or deleted the account).
+
+        Args:
+            error (TelegramAPIError): Error raised by the Bot API.
+
+        Returns:
+            bool: True for permanent delivery errors.
+    """
+    if isinstance(error, TelegramForbiddenError):
+        return True
+    if isinstance(error, TelegramBadRequest):
+        message = str(error).lower()
+        return any(reason in message for reason in UNREACHABLE_CHAT_ERRORS)
+    return False
+
+
+class TokenBucket:
+    """
+        Asynchronous token bucket limiting the global send rate.
+
+        Attributes:
+            rate (float): Tokens added per second.
+            capacity (int): Maximum number of tokens (allowed burst).
+    """
+    def __init__(self, rate: float, capacity: int) -> None:
+        self.rate: float = rate
+        self.capacity: int = max(1, capacity)
+        self._tokens: float = float(self.capacity)
+        self._updated: float = time.monotonic()
+        self._paused_until: float = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float) -> None:
+        """
+            Stops handing out tokens for the given number of seconds (used on TelegramRetryAfter).
+
+            Args:
+                seconds (float): Pause duration.
+        """
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0.0
+
+    async def acquire(self) -> None:
+        """
+            Waits until a token is available and takes it.
+        """
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    self._updated = time.monotonic()
+                    continue
+
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class BroadcastJob:
+    """
+        A list of messages addressed to one chat.
+
+        Attributes:
+            chat_id (int): Telegram chat id.
+            messages (List[str]): Messages to send, in order.
+            sent (int): Number of messages already delivered.
+            attempts (int): Number of RetryAfter and transient error re-queues so far.
+            ref (Any): Caller data passed back in the on_finished callback.
+            unreachable (bool): True if the chat blocked the bot or no longer exists.
+    """
+    __slots__ = ('chat_id', 'messages', 'sent', 'attempts', 'ref', 'unreachable')
+
+    def __init__(self, chat_id: int, messages: List[str], ref: Any = None) -> None:
+        self.chat_id: int = chat_id
+        self.messages: List[str] = messages
+        self.sent: int = 0
+        self.attempts: int = 0
+        self.ref: Any = ref
+        self.unreachable: bool = False
+
+
+class BroadcastStats:
+    """
+        Progress counters of a broadcast.
+
+        Attributes:
+            queued (int): Jobs accepted from the source.
+            delivered (int): Jobs whose messages were all sent.
+            failed (int): Jobs dropped after an API error or too many retries.
+            unreachable (int): Failed jobs whose chat blocked the bot or no longer exists.
+            retried (int): Number of RetryAfter and transient error re-queues.
+            messages_sent (int): Total number of sent messages.
+    """
+    def __init__(self) -> None:
+        self.queued: int = 0
+        self.delivered: int = 0
+        self.failed: int = 0
+        self.unreachable: int = 0
+        self.retried: int = 0
+        self.messages_sent: int = 0
+        self.started: float = time.monotonic()
+
+    @property
+    def done(self) -> int:
+        return self.delivered + self.failed
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "queued": self.queued,
+            "delivered": self.delivered,
+            "failed": self.failed,
+            "unreachable": self.unreachable,
+            "retried": self.retried,
+            "messages_sent": self.messages_sent,
+            "elapsed": round(self.elapsed, 2),
+        }
+
+
+class Broadcaster:
+    """
+        Sends BroadcastJob items with a global rate limit, per-chat pacing and bounded concurrency.
+
+        Jobs go through a bounded queue drained by a fixed pool of `concurrency` workers. At most
+        `queue_size` jobs are unfinished at a time, so memory does not depend on the size of the
+        source. Jobs that receive TelegramRetryAfter pause the global bucket and are put back
+        into the queue with the messages that are still left, once their chat's delay has passed.
+
+        If `on_finished` is given, it is called with every finished job and a flag telling
+        whether all of its messages were delivered; `job.sent` holds the delivered count.
+    """
+    def __init__(
+            self,
+            bot: Bot,
+            rate: float = BROADCAST_RATE,
+            burst: int = BROADCAST_BURST,
+            chat_interval: float = BROADCAST_CHAT_INTERVAL,
+            concurrency: int = BROADCAST_CONCURRENCY,
+            queue_size: int = BROADCAST_QUEUE_SIZE,
+            max_retries: int = BROADCAST_MAX_RETRIES,
+            progress_every: int = BROADCAST_PROGRESS_EVERY,
+            on_finished: Optional[Callable[[BroadcastJob, bool], None]] = None,
+    ) -> None:
+        self.bot: Bot = bot
+        self.bucket = TokenBucket(rate, burst)
+        self.chat_interval: float = chat_interval
+        self.concurrency: int = max(1, concurrency)
+        self.queue_size: int = max(self.concurrency, queue_size)
+        self.max_retries: int = max_retries
+        self.progress_every: int = max(1, progress_every)
+        self.on_finished = on_finished
+        self.stats = BroadcastStats()
+        self._chat_ready: Dict[int, float] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        # Re-queues waiting for the chat's backoff, by id of the job
+        self._delayed: Dict[int, asyncio.TimerHandle] = {}
+
+    async def run(self, jobs: AsyncIterable[BroadcastJob]) -> BroadcastStats:
+        """
+            Sends all jobs from the source and waits until every job is finished.
+            The source is consumed only as fast as the workers free queue slots.
+
+            Args:
+                jobs (AsyncIterable[BroadcastJob]): Jobs to send; consumed lazily.
+
+            Returns:
+                BroadcastStats: Final counters of the broadcast.
+        """
+        self.stats = BroadcastStats()
+        # Re-queued jobs still hold their slot, so the queue never exceeds its maxsize.
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._slots = asyncio.Semaphore(self.queue_size)
+
+        workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        try:
+            async for job in jobs:
+                await self._slots.acquire()
+                self.stats.queued += 1
+                self._queue.put_nowait(job)
+            await self._queue.join()
+        finally:
+            for handle in self._delayed.values():
+                handle.cancel()
+            self._delayed.clear()
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        logger.info(f"Broadcast finished: {self.stats.as_dict()}")
+        return self.stats
+
+    async def _worker(self) -> None:
+        """
+            Takes jobs from the queue and sends them until cancelled.
+        """
+        while True:
+            job: BroadcastJob = await self._queue.get()
+            try:
+                finished = await self._send_job(job)
+            except Exception as e:
+                logger.error(f"Unexpected broadcast error for chat {job.chat_id}: {e}", exc_info=True)
+                finished = True
+                self.stats.failed += 1
+
+            if finished:
+                self._chat_ready.pop(job.chat_id, None)
+                self._slots.release()
+                if self.on_finished is not None:
+                    try:
+                        self.on_finished(job, job.sent == len(job.messages))
+                    except Exception as e:
+                        logger.error(f"Error in broadcast on_finished callback: {e}", exc_info=True)
+                self._report_progress()
+                self._queue.task_done()
+            else:
+                self._requeue(job)
+
+    def _requeue(self, job: BroadcastJob) -> None:
+        """
+            Puts a job back into the queue once its chat may receive messages again, so no worker
+            sleeps on a backed-off chat while ready chats wait. The job keeps its slot meanwhile,
+            and its task_done is deferred until it is back in the queue, so join() waits for it.
+        """
+        def put_back() -> None:
+            self._delayed.pop(id(job), None)
+            self._queue.put_nowait(job)
+            self._queue.task_done()
+
+        delay = self._chat_ready.get(job.chat_id, 0.0) - time.monotonic()
+        if delay > 0:
+            self._delayed[id(job)] = asyncio.get_running_loop().call_later(delay, put_back)
+        else:
+            put_back()
+
+    async def _send_job(self, job: BroadcastJob) -> bool:
+        """
+            Sends the remaining messages of a job.
+
+            Args:
+                job (BroadcastJob): Job to send.
+
+            Returns:
+                bool: True if the job is finished (delivered or failed), False if it must be re-queued.
+        """
+        while job.sent < len(job.messages):
+            await self._wait_chat(job.chat_id)
+            await self.bucket.acquire()
+            try:
+                await self.bot.send_message(job.chat_id, job.messages[job.sent], parse_mode="Markdown")
+            except TelegramRetryAfter as e:
+                self.bucket.pause(e.retry_after)
+                self._chat_ready[job.chat_id] = time.monotonic() + e.retry_after
+                job.attempts += 1
+                if job.attempts > self.max_retries:
+                    logger.error(f"Giving up on chat {job.chat_id} after {job.attempts} RetryAfter errors")
+                    self.stats.failed += 1
+                    return True
+                self.stats.retried += 1
+                logger.warning(f"RetryAfter {e.retry_after}s for chat {job.chat_id}, re-queued")
+                return False
+            except (TelegramNetworkError, TelegramServerError) as e:
+                # Transient: the message may go through on a later attempt
+                job.attempts += 1
+                if job.attempts > self.max_retries:
+                    logger.error(f"Giving up on chat {job.chat_id} after {job.attempts} attempts: {e}")
+                    self.stats.failed += 1
+                    return True
+                delay = min(2 ** job.attempts, 60)
+                self._chat_ready[job.chat_id] = time.monotonic() + delay
+                self.stats.retried += 1
+                logger.warning(f"Transient error for chat {job.chat_id}, re-queued in {delay}s: {e}")
+                return False
+            except TelegramAPIError as e:
+                self.stats.failed += 1
+                if is_chat_unreachable(e):
+                    job.unreachable = True
+                    self.stats.unreachable += 1
+                    logger.info(f"Chat {job.chat_id} is unreachable: {e}")
+                else:
+                    logger.error(f"Error sending news to the user {job.chat_id}: {e}")
+                return True
+
+            job.sent += 1
+            self.stats.messages_sent += 1
+            self._chat_ready[job.chat_id] = time.monotonic() + self.chat_interval
+
+        self.stats.delivered += 1
+        return True
+
+    async def _wait_chat(self, chat_id: int) -> None:
+        """
+            Sleeps until the chat may receive the next message.
+
+            Args:
+                chat_id (int): Telegram chat id.
+        """
+        delay = self._chat_ready.get(chat_id, 0.0) - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _report_progress(self) -> None:
+        if self.stats.done % self.progress_every == 0:
+            logger.info(f"Broadcast progress: {self.stats.as_dict()}")
@@ -0,0 +1,148 @@
+"""
+Shared aiohttp client for the news sources.
+
+One ClientSession with a pooled keep-alive connector is created on first use and reused
+by every request, so DNS, TLS and proxy setup are paid once instead of on every run.
+Requests go through the configured proxy, have timeouts and are retried with jittered
+exponential backoff on connection errors, 429 and 5xx responses.
+"""
+
+from typing import Any, Dict, Optional
+import random
+
+import aiohttp
+import asyncio
+from decouple import config
+
+from utils.logger_config import logger
+
+HTTP_PROXY: str = config('proxy', default='')
+HTTP_TIMEOUT: float = config('HTTP_TIMEOUT', default=15, cast=float)
+HTTP_CONNECT_TIMEOUT: float = config('HTTP_CONNECT_TIMEOUT', default=5, cast=float)
+HTTP_POOL_SIZE: int = config('HTTP_POOL_SIZE', default=20, cast=int)
+HTTP_POOL_PER_HOST: int = config('HTTP_POOL_PER_HOST', default=4, cast=int)
+HTTP_RETRIES: int = config('HTTP_RETRIES', default=3, cast=int)
+HTTP_BACKOFF: float = config('HTTP_BACKOFF', default=1.0, cast=float)
+# Longest wait accepted from a Retry-After header
+HTTP_MAX_RETRY_AFTER: float = config('HTTP_MAX_RETRY_AFTER', default=60, cast=float)
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+_session: Optional[aiohttp.ClientSession] = None
+
+
+def proxy_url() -> Optional[str]:
+    """
+        Return (Optional[str]): the proxy from the 'proxy' setting as an URL, None if it is not set.
+    """
+    proxy = HTTP_PROXY.strip()
+    if not proxy:
+        return None
+    return proxy if "://" in proxy else f"http://{proxy}"
+
+
+def get_session() -> aiohttp.ClientSession:
+    """
+        Return (aiohttp.ClientSession): the shared session, created on the running event loop on first use.
+    """
+    global _session
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=HTTP_POOL_SIZE,
+            limit_per_host=HTTP_POOL_PER_HOST,
+            ttl_dns_cache=300,
+            keepalive_timeout=60,
+        )
+        _session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+        )
+    return _session
+
+
+async def close_http_session() -> None:
+    """
+        Close the shared session and its pooled connections, on shutdown.
+    """
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
+class HttpResponse:
+    """
+        Status, headers and body of a completed response.
+
+        Attributes:
+            status (int): HTTP status, e.g. 200 or 304.
+            headers (Dict[str, str]): Response headers with lowercase names.
+            body (bytes): Response body, empty for 304.
+    """
+    __slots__ = ("status", "headers", "body")
+
+    def __init__(self, status: int, headers: Dict[str, str], body: bytes) -> None:
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+
+async def fetch(
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        params: Optional[Dict[str, Any]] = None,
+        retries: int = HTTP_RETRIES
+) -> HttpResponse:
+    """
+        GET an URL through the shared session. A 304 Not Modified answer to a conditional request
+        (If-None-Match / If-Modified-Since headers) is returned, not raised.
+
+        Args:
+            url (str): Requested URL.
+            headers (Optional[Dict[str, str]]): Request headers.
+            params (Optional[Dict[str, Any]]): Query parameters.
+            retries (int): Retries after a connection error, timeout, 429 or 5xx.
+
+        Returns:
+            HttpResponse: The response.
+
+        Raises:
+            aiohttp.ClientError: If the last attempt failed or the response is another error status.
+            asyncio.TimeoutError: If the last attempt timed out.
+    """
+    attempt = 0
+    while True:
+        try:
+            async with get_session().get(url, headers=headers, params=params, proxy=proxy_url()) as response:
+                if response.status in RETRY_STATUSES and attempt < retries:
+                    # Slept after the block, so the pooled connection is released while waiting
+                    delay = retry_delay(response.headers.get("Retry-After", ""), attempt)
+                    logger.warning(f"GET {url} returned {response.status}, retry {attempt + 1} in {delay:.1f}s")
+                else:
+                    response.raise_for_status()
+                    body = b"" if response.status == 304 else await response.read()
+                    return HttpResponse(response.status, {k.lower(): v for k, v in response.headers.items()}, body)
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            if attempt >= retries:
+                raise
+            delay = backoff_delay(attempt)
+            logger.warning(f"GET {url} failed ({e!r}), retry {attempt + 1} in {delay:.1f}s")
+        await asyncio.sleep(delay)
+        attempt += 1
+
+
+def retry_delay(retry_after: str, attempt: int) -> float:
+    """
+        Return (float): the wait before the next attempt in seconds: the server's Retry-After seconds,
+        capped at HTTP_MAX_RETRY_AFTER, or the backoff delay if the header is missing.
+    """
+    if retry_after.isdigit():
+        return min(float(retry_after), HTTP_MAX_RETRY_AFTER)
+    return backoff_delay(attempt)
+
+
+def backoff_delay(attempt: int) -> float:
+    """
+        Return (float): exponential backoff with full jitter for the attempt, in seconds.
+    """
+    return random.uniform(0, HTTP_BACKOFF * 2 ** attempt)
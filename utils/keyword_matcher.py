@@ -0,0 +1,121 @@
+"""
+Multi-pattern keyword matching for the keyword-subscriber broadcast.
+
+All keywords of all subscribers are compiled into one Aho-Corasick automaton over word tokens,
+so every news text is scanned once no matter how many users and keywords there are.
+Tokenization follows the FTS5 index (unicode61, case and diacritics folded), so a keyword
+matches the same news here as in get_key_daily.
+"""
+
+from collections import deque
+from typing import Dict, Iterable, List, Set, Tuple
+import re
+import unicodedata
+
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+Phrase = Tuple[str, ...]
+
+
+def tokenize(text: str) -> List[str]:
+    """
+        Split a text into lowercase word tokens without diacritics.
+
+        Args:
+            text (str): Text to split.
+
+        Returns:
+            List[str]: Word tokens.
+    """
+    folded = unicodedata.normalize("NFKD", text.casefold())
+    folded = "".join(ch for ch in folded if not unicodedata.combining(ch))
+    return WORD_RE.findall(folded)
+
+
+def normalize_keyword(keyword: str) -> Phrase:
+    """
+        Return (Phrase): the keyword as a tuple of word tokens, empty if it has no words.
+    """
+    return tuple(tokenize(keyword))
+
+
+class KeywordMatcher:
+    """
+        Aho-Corasick automaton over word tokens.
+
+        Attributes:
+            phrases (Set[Phrase]): Compiled keyword phrases.
+    """
+    def __init__(self, keywords: Iterable[str]) -> None:
+        self.phrases: Set[Phrase] = set()
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Set[Phrase]] = [set()]
+
+        for keyword in keywords:
+            phrase = normalize_keyword(keyword)
+            if phrase:
+                self._add(phrase)
+        self._build_failure_links()
+
+    def _add(self, phrase: Phrase) -> None:
+        self.phrases.add(phrase)
+        state = 0
+        for token in phrase:
+            next_state = self._goto[state].get(token)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][token] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(set())
+            state = next_state
+        self._output[state].add(phrase)
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and token not in self._goto[fail]:
+                    fail = self._fail[fail]
+                candidate = self._goto[fail].get(token, 0)
+                self._fail[next_state] = candidate if candidate != next_state else 0
+                self._output[next_state] |= self._output[self._fail[next_state]]
+
+    def find(self, text: str) -> Set[Phrase]:
+        """
+            Return (Set[Phrase]): every compiled phrase that occurs in the text.
+
+            Args:
+                text (str): Text to scan.
+        """
+        found: Set[Phrase] = set()
+        state = 0
+        for token in tokenize(text):
+            while state and token not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(token, 0)
+            if self._output[state]:
+                found |= self._output[state]
+        return found
+
+
+def match_texts(matcher: KeywordMatcher, texts: Dict[int, str]) -> Dict[Phrase, Set[int]]:
+    """
+        Scan every text once and collect the ids of texts containing each phrase.
+
+        Args:
+            matcher (KeywordMatcher): Compiled keywords.
+            texts (Dict[int, str]): Texts by id (for example news id).
+
+        Returns:
+            Dict[Phrase, Set[int]]: Matching ids by phrase.
+    """
+    matches: Dict[Phrase, Set[int]] = {}
+    for text_id, text in texts.items():
+        for phrase in matcher.find(text):
+            matches.setdefault(phrase, set()).add(text_id)
+    return matches
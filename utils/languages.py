@@ -108,6 +108,19 @@ NO_FRESH_NEWS = {
     "pt": "Não há notícias recentes para sua consulta."
 }
 
+WARMING_UP = {
+    "ru": "Бот только что перезапустился и загружает свежие новости. Попробуйте через пару минут.",
+    "en": "The bot has just restarted and is loading fresh news. Please try again in a couple of minutes.",
+    "es": "El bot se acaba de reiniciar y está cargando noticias nuevas. Inténtelo de nuevo en un par de minutos.",
+    "de": "Der Bot wurde gerade neu gestartet und lädt aktuelle Nachrichten. Bitte versuchen Sie es in ein paar Minuten erneut.",
+    "fr": "Le bot vient de redémarrer et charge les dernières nouvelles. Réessayez dans quelques minutes.",
+    "zh": "机器人刚刚重启，正在加载最新新闻。请几分钟后再试。",
+    "ja": "ボットは再起動したばかりで、最新ニュースを読み込んでいます。数分後にもう一度お試しください。",
+    "ar": "تمت إعادة تشغيل البوت للتو وهو يحمّل آخر الأخبار. يرجى المحاولة مرة أخرى بعد بضع دقائق.",
+    "hi": "बॉट अभी-अभी पुनः आरंभ हुआ है और ताज़ा खबरें लोड कर रहा है। कृपया कुछ मिनट बाद फिर से प्रयास करें।",
+    "pt": "O bot acabou de reiniciar e está carregando notícias recentes. Tente novamente em alguns minutos."
+}
+
 LINK = {
     "ru": "ссылка",
     "en": "link",
@@ -0,0 +1,119 @@
+"""
+Near-duplicate detection for ingested news.
+
+Two kinds of duplicates are caught before a news item is stored and translated:
+- the same article under another URL: tracking parameters, fragments, 'www.', default ports,
+  a trailing slash and the order of query parameters are removed by canonical_url;
+- the same story on another outlet or slightly reworded: a 64-bit SimHash of the title and
+  description is compared with the news of the last NEAR_DUP_DAYS days.
+
+The fingerprint is split into 4 bands of 16 bits, each stored in an indexed column. Two fingerprints
+within Hamming distance 3 share at least one band exactly (pigeonhole), so candidates are found
+with an index lookup per band instead of comparing with every stored fingerprint.
+"""
+
+from typing import List, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import hashlib
+
+from decouple import config
+
+from utils.keyword_matcher import tokenize
+
+# Maximum Hamming distance between fingerprints of near-duplicates; banding guarantees recall up to BANDS - 1
+NEAR_DUP_DISTANCE: int = config('NEAR_DUP_DISTANCE', default=3, cast=int)
+NEAR_DUP_DAYS: int = config('NEAR_DUP_DAYS', default=3, cast=int)
+
+BANDS = 4
+BAND_BITS = 16
+
+TRACKING_PARAMS = frozenset({
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+    "ref", "ref_src", "ref_url", "source", "cmpid", "ncid", "guccounter", "_ga", "spm",
+})
+TRACKING_PREFIXES = ("utm_", "pk_", "mtm_")
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def canonical_url(url: str) -> str:
+    """
+        Normalize an URL so that variants of the same article compare equal.
+
+        Args:
+            url (str): URL of the news.
+
+        Returns:
+            str: The URL with lowercase scheme and host, no 'www.', default port, fragment,
+                tracking parameters or trailing slash, and sorted query parameters.
+    """
+    parts = urlsplit(url.strip())
+    scheme = (parts.scheme or "https").lower()
+    if scheme == "http":
+        scheme = "https"
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port != DEFAULT_PORTS.get(parts.scheme.lower()):
+        host = f"{host}:{parts.port}"
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+def _feature_hash(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def simhash(text: str) -> int:
+    """
+        Compute the 64-bit SimHash of a text over its word unigrams and bigrams.
+
+        Args:
+            text (str): Title and description of the news.
+
+        Returns:
+            int: Unsigned 64-bit fingerprint, 0 for a text without words.
+    """
+    tokens = tokenize(text)
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    if not features:
+        return 0
+    weights = [0] * 64
+    for feature in features:
+        h = _feature_hash(feature)
+        for bit in range(64):
+            weights[bit] += 1 if h >> bit & 1 else -1
+    return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+
+def hamming(a: int, b: int) -> int:
+    """
+        Return (int): the number of differing bits of two fingerprints.
+    """
+    return bin((a ^ b) & 0xFFFFFFFFFFFFFFFF).count("1")
+
+
+def bands(fingerprint: int) -> List[int]:
+    """
+        Return (List[int]): the BANDS 16-bit bands of a fingerprint, lowest first.
+    """
+    mask = (1 << BAND_BITS) - 1
+    return [(fingerprint >> (band * BAND_BITS)) & mask for band in range(BANDS)]
+
+
+def to_signed(fingerprint: int) -> int:
+    """
+        Return (int): the unsigned 64-bit fingerprint as a signed integer, as SQLite stores 64-bit signed integers.
+    """
+    return fingerprint - (1 << 64) if fingerprint >= 1 << 63 else fingerprint
+
+
+def fingerprint_news(url: str, title: str, description: str) -> Tuple[str, int]:
+    """
+        Return (Tuple[str, int]): canonical URL and unsigned SimHash of a news item.
+    """
+    return canonical_url(url), simhash(f"{title or ''}\n{description or ''}")
@@ -0,0 +1,112 @@
+"""
+In-process cache for the results of daily news queries.
+
+Results of get_all_daily and get_key_daily only change when news.db is written by the
+ingest or translation jobs. The writers call bump_news_generation(), which makes every
+cached entry stale, so readers are served from memory until the data actually changes.
+"""
+
+from collections import OrderedDict
+from datetime import date
+from typing import Dict, FrozenSet, Hashable, Iterable, List, Optional, Tuple
+import threading
+
+from decouple import config
+
+NEWS_CACHE_SIZE: int = config('NEWS_CACHE_SIZE', default=256, cast=int)
+
+CacheKey = Tuple[str, Optional[FrozenSet[str]], date]
+
+
+def make_key(lang_code: str, keys: Optional[Iterable[str]] = None) -> CacheKey:
+    """
+        Build a cache key from the language, the normalized keyword set and today's date.
+
+        Args:
+            lang_code (str): Language code.
+            keys (Optional[Iterable[str]]): Keywords, None for all news.
+
+        Returns:
+            CacheKey: (lang_code, keywords or None, day).
+    """
+    keyword_set: Optional[FrozenSet[str]] = None
+    if keys is not None:
+        keyword_set = frozenset(k.strip().lower() for k in keys if k.strip())
+    return lang_code, keyword_set, date.today()
+
+
+class NewsQueryCache:
+    """
+        Size-bounded LRU cache invalidated by a generation counter.
+
+        Attributes:
+            maxsize (int): Maximum number of cached results.
+            generation (int): Incremented by every write to news.db.
+            hits (int): Number of lookups served from memory.
+            misses (int): Number of lookups that went to the database.
+    """
+    def __init__(self, maxsize: int = NEWS_CACHE_SIZE) -> None:
+        self.maxsize: int = max(1, maxsize)
+        self.generation: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self._entries: "OrderedDict[Hashable, Tuple[int, List[str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[List[str]]:
+        """
+            Return (Optional[List[str]]): the cached result or None if it is missing or stale.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != self.generation:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(entry[1])
+
+    def put(self, key: Hashable, value: List[str], generation: int) -> None:
+        """
+            Store a result computed while the cache was at the given generation.
+            Results computed before a concurrent write are not stored.
+        """
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[key] = (generation, list(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def bump(self) -> None:
+        """
+            Invalidate every cached result; called by the news.db writers.
+        """
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """
+            Return (Dict[str, float]): hit and miss counters for tuning the cache size.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "size": len(self._entries),
+                "generation": self.generation,
+            }
+
+
+news_cache = NewsQueryCache()
+
+
+def bump_news_generation() -> None:
+    """
+        Mark cached news query results as stale after news.db was written.
+    """
+    news_cache.bump()
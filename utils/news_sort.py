@@ -1,16 +1,47 @@
 from datetime import datetime, timedelta
-from functools import reduce
-import operator
+import re
 from typing import List, Union, Tuple
 
-from db_peewee.db_news_class import NewsDB, news_db
+from peewee import JOIN
+
+from db_peewee.db_news_class import NewsDB, NewsFTS, NewsTranslation
 from utils.languages import LINK
 from utils.logger_config import logger
+from utils.news_cache import make_key, news_cache
+
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+def today_range() -> Tuple[datetime, datetime]:
+    """
+    Return (Tuple[datetime, datetime]): start of today and start of tomorrow.
+    """
+    start_datetime = datetime.combine(datetime.now().date(), datetime.min.time())
+    return start_datetime, start_datetime + timedelta(days=1)
+
+def select_news_in_language(lang_code: str):
+    """
+    Build a query over news joined with their translation into one language only.
+    Every returned NewsDB object also has `title` and `description` attributes,
+    None if the news is not translated yet.
+
+    Args:
+        lang_code (str): Language code, e.g. 'en', 'ru', 'fr'.
+
+    Returns:
+        ModelSelect: Query to be filtered by the caller.
+    """
+    return (NewsDB
+            .select(NewsDB.id, NewsDB.url, NewsDB.createdat, NewsTranslation.title, NewsTranslation.description)
+            .join(NewsTranslation, JOIN.LEFT_OUTER, on=(
+                (NewsTranslation.news == NewsDB.id) &
+                (NewsTranslation.lang == lang_code)
+            ))
+            .objects())
 
 def get_all_daily(lang_code: str) -> List[str]:
     """
     Retrieve all news descriptions created today for the specified language,
-    along with their URLs.
+    along with their URLs. Results are served from news_cache until news.db changes.
 
     Args:
         lang_code (str): Language code, e.g. 'en', 'ru', 'fr'.
@@ -18,85 +49,120 @@ def get_all_daily(lang_code: str) -> List[str]:
     Returns:
         List[str]: List of formatted strings with description and link.
     """
-    if news_db.is_closed():
-        news_db.connect()
+    cache_key = make_key(lang_code)
+    cached = news_cache.get(cache_key)
+    if cached is not None:
+        return cached
 
-    try:
-        today = datetime.now().date()
-        start_datetime = datetime.combine(today, datetime.min.time())
-        end_datetime = start_datetime + timedelta(days=1)
+    generation = news_cache.generation
+    results = _query_all_daily(lang_code)
+    news_cache.put(cache_key, results, generation)
+    return results
 
-        description_field = getattr(NewsDB, f'description_{lang_code}')
+def _query_all_daily(lang_code: str) -> List[str]:
+    start_datetime, end_datetime = today_range()
 
+    query = (select_news_in_language(lang_code)
+             .where(
+                (NewsDB.createdat >= start_datetime) &
+                (NewsDB.createdat < end_datetime) &
+                (NewsTranslation.description.is_null(False))
+             )
+             .order_by(NewsDB.createdat.desc())
+            )
 
-        query = (NewsDB
-                 .select()
-                 .where(
-                    (NewsDB.createdat >= start_datetime) &
-                    (NewsDB.createdat < end_datetime) &
-                    (description_field.is_null(False))
-                 )
-                 .order_by(NewsDB.createdat.desc())
-                )
+    return set_links(lang_code=lang_code, query=query)
 
+def build_match_expression(keys: Union[List[str], Tuple[str, ...]]) -> str:
+    """
+        Build an FTS5 MATCH expression that finds any of the keywords.
+        Every keyword becomes a quoted phrase of its word tokens, so punctuation in the news text
+        ("bitcoin,") and in the user input cannot break the query.
 
-    finally:
-        if not news_db.is_closed():
-            news_db.close()
+        Args:
+            keys (Union[List[str], Tuple[str, ...]]): Keywords entered by the user.
 
-    return set_links(lang_code=lang_code, query=query)
+        Returns:
+            str: Expression like '"bitcoin" OR "solana etf"', empty if there are no words.
+    """
+    phrases = []
+    for key in keys:
+        tokens = WORD_RE.findall(key)
+        if tokens:
+            phrases.append('"' + " ".join(tokens) + '"')
+    return " OR ".join(phrases)
 
 def get_key_daily(*keys: Union[str, List[str], Tuple[str, ...]], lang_code: str) -> List[str]:
-    if news_db.is_closed():
-        news_db.connect()
+    """
+    Retrieve news created today whose English title or description contains any of the keywords,
+    using the FTS5 keyword index, formatted for the specified language.
+    Results are served from news_cache until news.db changes.
+
+    Args:
+        *keys (Union[str, List[str], Tuple[str, ...]]): Keywords, or one list/tuple of keywords.
+        lang_code (str): Language code, e.g. 'en', 'ru', 'fr'.
 
+    Returns:
+        List[str]: List of formatted strings with description and link.
+    """
     if len(keys) == 1 and isinstance(keys[0], (list, tuple)):
         keys = keys[0]
 
-    if not keys:
-        if not news_db.is_closed():
-            news_db.close()
-        return []
-
-    today = datetime.now().date()
-    start_datetime = datetime.combine(today, datetime.min.time())
-    end_datetime = start_datetime + timedelta(days=1)
+    cache_key = make_key(lang_code, keys)
+    cached = news_cache.get(cache_key)
+    if cached is not None:
+        return cached
 
-    description_en_field = getattr(NewsDB, 'description_en')
+    generation = news_cache.generation
+    results = _query_key_daily(keys, lang_code)
+    news_cache.put(cache_key, results, generation)
+    return results
 
-    conditions = []
-    for key in keys:
-        key = key.strip()
-        if not key:
-            continue
-        conditions.append(description_en_field ** f'{key}')
-        conditions.append(description_en_field ** f'{key} %')
-        conditions.append(description_en_field ** f'% {key} %')
-        conditions.append(description_en_field ** f'% {key}')
-
-    if not conditions:
-        if not news_db.is_closed():
-            news_db.close()
+def _query_key_daily(keys: Union[List[str], Tuple[str, ...]], lang_code: str) -> List[str]:
+    match_expression = build_match_expression(keys)
+    if not match_expression:
         return []
 
-    combined_condition = reduce(operator.or_, conditions)
+    start_datetime, end_datetime = today_range()
 
-    query = (NewsDB
-             .select()
+    matched_ids = (NewsTranslation
+                   .select(NewsTranslation.news)
+                   .where(NewsTranslation.id.in_(
+                       NewsFTS.select(NewsFTS.rowid).where(NewsFTS.match(match_expression))
+                   )))
+
+    query = (select_news_in_language(lang_code)
              .where(
+                 (NewsDB.id.in_(matched_ids)) &
                  (NewsDB.createdat >= start_datetime) &
-                 (NewsDB.createdat < end_datetime) &
-                 combined_condition
+                 (NewsDB.createdat < end_datetime)
              )
              .order_by(NewsDB.createdat.desc())
             )
 
-    logger.info(f"Found {query.count()} news matching keys {keys} in English description.")
+    results = set_links(lang_code=lang_code, query=query)
+    logger.info(f"Found {len(results)} news matching keys {keys} in English title or description.")
 
-    if not news_db.is_closed():
-        news_db.close()
+    return results
 
-    return set_links(lang_code=lang_code, query=query)
+def get_daily_news(lang_code: str = "en") -> List[NewsDB]:
+    """
+    Retrieve all news created today with their title and description in one language, newest first.
+
+    Args:
+        lang_code (str): Language code, e.g. 'en', 'ru', 'fr'.
+
+    Returns:
+        List[NewsDB]: News objects with `title` and `description` attributes (None if not translated).
+    """
+    start_datetime, end_datetime = today_range()
+
+    return list(select_news_in_language(lang_code)
+                .where(
+                    (NewsDB.createdat >= start_datetime) &
+                    (NewsDB.createdat < end_datetime)
+                )
+                .order_by(NewsDB.createdat.desc()))
 
 def set_links(lang_code: str, query) -> List[str]:
     """
@@ -104,14 +170,14 @@ def set_links(lang_code: str, query) -> List[str]:
 
         Args:
             lang_code (str): Language code to select the appropriate link text.
-            query: Peewee query result iterable containing news items.
+            query: Iterable of news items with `description` (in lang_code) and `url` attributes.
 
         Returns:
             List[str]: List of formatted news strings with description and localized link.
     """
     results = []
     for news in query:
-        description = getattr(news, f'description_{lang_code}', '') or ''
+        description = getattr(news, 'description', '') or ''
         url = news.url or ""
         results.append(f"{description} [[{LINK.get(lang_code, 'link')}]({url})]")
     return results
\ No newline at end of file
@@ -0,0 +1,35 @@
+"""
+News source plugins.
+
+Every source subclasses NewsSource: it tells which URL to GET and how to parse the body
+into NewsItem objects, the common model that is stored in NewsDB. Available sources:
+- RapidAPISource: endpoints of cryptocurrency-news2 on RapidAPI (RAPID_ENDPOINTS, comma separated)
+- RSSSource: RSS 2.0 and Atom feeds (RSS_FEEDS, comma separated URLs)
+Requests to RapidAPI count against a daily budget, see quota.
+"""
+
+from typing import List
+
+from decouple import Csv, config
+
+from utils.news_sources.base import NewsItem, NewsSource, SourceResult
+from utils.news_sources.quota import RequestQuota, rapid_quota
+from utils.news_sources.rapidapi import RAPID_ENDPOINTS, RapidAPISource
+from utils.news_sources.rss import RSSSource
+
+RSS_FEEDS: List[str] = config('RSS_FEEDS', default='', cast=Csv())
+
+
+def build_sources() -> List[NewsSource]:
+    """
+        Return (List[NewsSource]): the configured news sources.
+    """
+    sources: List[NewsSource] = [RapidAPISource(endpoint) for endpoint in RAPID_ENDPOINTS if endpoint]
+    sources.extend(RSSSource(feed_url) for feed_url in RSS_FEEDS if feed_url)
+    return sources
+
+
+__all__ = [
+    "NewsItem", "NewsSource", "SourceResult", "RapidAPISource", "RSSSource", "RequestQuota",
+    "build_sources", "rapid_quota",
+]
@@ -0,0 +1,123 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from utils.http_client import HTTP_RETRIES, fetch
+
+
+class NewsItem:
+    """
+        A news item in the form shared by all sources, before it is stored in NewsDB.
+
+        Attributes:
+            url (str): Link to the original news.
+            title (str): English title.
+            description (str): English description.
+            thumbnail (Optional[str]): Link to the news image.
+            created_at (datetime): Publication time, timezone aware.
+            source (str): Name of the source that returned the item.
+    """
+    __slots__ = ("url", "title", "description", "thumbnail", "created_at", "source")
+
+    def __init__(
+            self,
+            url: str,
+            title: str,
+            description: str,
+            created_at: datetime,
+            thumbnail: Optional[str] = None,
+            source: str = ""
+    ) -> None:
+        self.url = url
+        self.title = title
+        self.description = description
+        self.thumbnail = thumbnail
+        self.created_at = created_at
+        self.source = source
+
+    def __repr__(self) -> str:
+        return f"NewsItem(url={self.url!r}, source={self.source!r}, created_at={self.created_at})"
+
+
+class SourceResult:
+    """
+        Result of fetching a source.
+
+        Attributes:
+            items (Optional[List[NewsItem]]): Parsed items, None if the source answered 304 Not Modified.
+            etag (Optional[str]): ETag to send next time.
+            last_modified (Optional[str]): Last-Modified to send next time.
+    """
+    __slots__ = ("items", "etag", "last_modified")
+
+    def __init__(self, items: Optional[List[NewsItem]], etag: Optional[str], last_modified: Optional[str]) -> None:
+        self.items = items
+        self.etag = etag
+        self.last_modified = last_modified
+
+
+class NewsSource(ABC):
+    """
+        Base class of the news source plugins.
+
+        A source tells where to GET its content and how to parse the body into NewsItem objects;
+        fetching through the shared HTTP session and conditional GET with ETag/Last-Modified
+        are done here.
+
+        Attributes:
+            name (str): Unique source name, the key of its stored conditional GET state.
+            quota_limited (bool): True if requests count against the daily budget, see utils.news_sources.quota.
+    """
+    name: str = ""
+    quota_limited: bool = False
+
+    @abstractmethod
+    def url(self) -> str:
+        """
+            Return (str): the URL to GET.
+        """
+
+    def headers(self) -> Dict[str, str]:
+        """
+            Return (Dict[str, str]): request headers, e.g. API keys.
+        """
+        return {}
+
+    @abstractmethod
+    def parse(self, body: bytes) -> List[NewsItem]:
+        """
+            Parse the response body into news items.
+
+            Args:
+                body (bytes): Response body.
+
+            Returns:
+                List[NewsItem]: Items of the source, with source set to its name.
+        """
+
+    async def fetch(self, etag: Optional[str] = None, last_modified: Optional[str] = None) -> SourceResult:
+        """
+            GET the source, conditionally if a previous ETag or Last-Modified is known.
+
+            Args:
+                etag (Optional[str]): ETag of the previous response.
+                last_modified (Optional[str]): Last-Modified of the previous response.
+
+            Returns:
+                SourceResult: Parsed items, or None items if nothing changed, and the new validators.
+        """
+        headers = dict(self.headers())
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+        # Every attempt of a metered source is billed and counted once by the quota, so it is not retried here
+        response = await fetch(self.url(), headers=headers, retries=0 if self.quota_limited else HTTP_RETRIES)
+        if response.status == 304:
+            return SourceResult(None, etag, last_modified)
+        return SourceResult(
+            self.parse(response.body),
+            response.headers.get("etag"),
+            response.headers.get("last-modified"),
+        )
@@ -0,0 +1,149 @@
+"""
+Daily request budget of the metered news sources (RapidAPI).
+
+Every request to a quota-limited source is spent here, by digests, the warm-up and the adaptive
+poller alike, and sources are skipped once the day's budget is used up. Metered sources are
+fetched without HTTP retries, so one spend is one billed call. The usage of the day is stored
+in news.db (see ingest_news), so a restart does not reset it.
+
+The default budget keeps the cost of the former fixed schedule: two fetches per endpoint for the
+cron jobs and one for the fetch on start-up. The digests' fetches are reserved, so the poller can
+never leave a digest without fresh news. The third one goes to the adaptive poller, which also
+takes over the start-up fetch (the warm-up leaves metered sources out), so a restart costs nothing
+extra and every day has at least one poll between the digests. The poller spreads what is left
+evenly until the reset, so its last poll of the day is not made just before fresh requests arrive;
+raising RAPID_DAILY_QUOTA to the plan's allowance gives it more.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Tuple
+
+from decouple import config
+
+from utils.news_sources.rapidapi import RAPID_ENDPOINTS
+
+# Fetches per endpoint per day: the morning and evening digests
+DIGEST_FETCHES = 2
+
+RAPID_DAILY_QUOTA: int = config('RAPID_DAILY_QUOTA', default=(DIGEST_FETCHES + 1) * len(RAPID_ENDPOINTS), cast=int)
+# Requests of the day kept for the digests
+RAPID_QUOTA_RESERVE: int = config('RAPID_QUOTA_RESERVE', default=DIGEST_FETCHES * len(RAPID_ENDPOINTS), cast=int)
+
+
+class RequestQuota:
+    """
+        Counter of the requests spent on the current UTC day.
+
+        Attributes:
+            name (str): Key of the stored usage.
+            daily_limit (int): Requests allowed per day.
+            reserve (int): Requests of the day that only reserved (digest) fetches may spend.
+            restored (bool): True once the stored usage was loaded.
+    """
+    __slots__ = ("name", "daily_limit", "reserve", "restored", "_day", "_used", "_reserved_used")
+
+    def __init__(self, name: str, daily_limit: int = RAPID_DAILY_QUOTA, reserve: int = RAPID_QUOTA_RESERVE) -> None:
+        self.name = name
+        self.daily_limit = max(0, daily_limit)
+        self.reserve = min(max(0, reserve), self.daily_limit)
+        self.restored: bool = False
+        self._day: str = self._today()
+        self._used: int = 0
+        self._reserved_used: int = 0
+
+    @staticmethod
+    def _today() -> str:
+        return datetime.now(timezone.utc).date().isoformat()
+
+    def _roll(self) -> None:
+        today = self._today()
+        if today != self._day:
+            self._day = today
+            self._used = 0
+            self._reserved_used = 0
+
+    def restore(self, day: str, used: int, reserved_used: int) -> None:
+        """
+            Continue from the stored usage; usage of a previous day is ignored.
+        """
+        self.restored = True
+        self._roll()
+        if day == self._day:
+            self._used = max(self._used, used)
+            self._reserved_used = max(self._reserved_used, reserved_used)
+
+    def usage(self) -> Tuple[str, int, int]:
+        """
+            Return (Tuple[str, int, int]): day, requests used and reserved requests used, for storing.
+        """
+        self._roll()
+        return self._day, self._used, self._reserved_used
+
+    @property
+    def remaining(self) -> int:
+        """
+            Return (int): requests left today for unreserved fetches.
+        """
+        self._roll()
+        unreserved_used = self._used - self._reserved_used
+        return max(0, min(self.daily_limit - self._used, self.daily_limit - self.reserve - unreserved_used))
+
+    def try_spend(self, reserved: bool = False) -> bool:
+        """
+            Spend one request of today's budget.
+
+            Args:
+                reserved (bool): True for a digest fetch, which may also spend the reserve.
+
+            Returns:
+                bool: False if the budget is used up and the request must not be made.
+        """
+        self._roll()
+        if self._used >= self.daily_limit:
+            return False
+        if reserved and self._reserved_used < self.reserve:
+            self._reserved_used += 1
+        elif self.remaining <= 0:
+            return False
+        self._used += 1
+        return True
+
+    def pacing_interval(self, sources: int) -> float:
+        """
+            Shortest poll interval of each quota-limited source that spreads the unreserved requests
+            evenly over the time until the quota resets.
+
+            Args:
+                sources (int): Number of quota-limited sources polled.
+
+            Returns:
+                float: Interval in seconds; if nothing is left to spend, the time until the reset
+                plus the first interval of the next day.
+        """
+        now = datetime.now(timezone.utc)
+        reset = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), tzinfo=timezone.utc)
+        until_reset = (reset - now).total_seconds()
+        sources = max(1, sources)
+        available = self.remaining
+        if available <= 0:
+            next_day = self._spread(timedelta(days=1).total_seconds(), self.daily_limit - self.reserve, sources)
+            return until_reset + next_day
+        return self._spread(until_reset, available, sources)
+
+    @staticmethod
+    def _spread(seconds: float, available: int, sources: int) -> float:
+        """
+            Return (float): interval that fits the requests of every source into the period
+            with a gap left at its end as well.
+        """
+        return seconds * sources / (max(0, available) + sources)
+
+    def stats(self) -> dict:
+        """
+            Return (dict): limit, reserve, used and remaining requests of today.
+        """
+        remaining = self.remaining
+        return {"limit": self.daily_limit, "reserve": self.reserve, "used": self._used, "remaining": remaining}
+
+
+rapid_quota = RequestQuota("rapidapi")
@@ -0,0 +1,60 @@
+from datetime import datetime
+from typing import Any, Dict, List
+import json
+
+from decouple import Csv, config
+
+from utils.logger_config import logger
+from utils.news_sources.base import NewsItem, NewsSource
+
+RAPID_BASE_URL: str = config('RAPID_BASE_URL', default='https://cryptocurrency-news2.p.rapidapi.com')
+RAPID_HOST: str = config('RAPID_HOST', default='cryptocurrency-news2.p.rapidapi.com')
+RAPID_ENDPOINTS: List[str] = [endpoint for endpoint in config('RAPID_ENDPOINTS', default='cryptodaily', cast=Csv()) if endpoint]
+
+RAPID_DATE_FORMAT = '%a, %d %b %Y %H:%M:%S %z'
+
+
+class RapidAPISource(NewsSource):
+    """
+        A cryptocurrency-news2 endpoint on RapidAPI, e.g. 'cryptodaily'.
+
+        Attributes:
+            endpoint (str): Endpoint name after /v1/.
+    """
+    quota_limited = True
+
+    def __init__(self, endpoint: str) -> None:
+        self.endpoint = endpoint
+        self.name = f"rapidapi:{endpoint}"
+
+    def url(self) -> str:
+        return f"{RAPID_BASE_URL.rstrip('/')}/v1/{self.endpoint}"
+
+    def headers(self) -> Dict[str, str]:
+        return {
+            "x-rapidapi-key": config('RAPID_KEY'),
+            "x-rapidapi-host": RAPID_HOST,
+        }
+
+    def parse(self, body: bytes) -> List[NewsItem]:
+        data: Dict[str, Any] = json.loads(body)
+        items: List[NewsItem] = []
+        for item in data.get("data", []):
+            news_url = item.get('url')
+            created_at_str: str = item.get('createdAt', '')
+            if not news_url or not created_at_str:
+                continue
+            try:
+                created_at = datetime.strptime(created_at_str, RAPID_DATE_FORMAT)
+            except ValueError as e:
+                logger.error(f"Date parsing error: {created_at_str} — {e}")
+                continue
+            items.append(NewsItem(
+                url=news_url,
+                title=item.get('title', ''),
+                description=item.get('description', ''),
+                created_at=created_at,
+                thumbnail=item.get('thumbnail') or None,
+                source=self.name,
+            ))
+        return items
@@ -0,0 +1,111 @@
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import List, Optional
+from xml.etree import ElementTree
+import html
+import re
+
+from utils.logger_config import logger
+from utils.news_sources.base import NewsItem, NewsSource
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+MEDIA = "{http://search.yahoo.com/mrss/}"
+
+TAG_RE = re.compile(r"<[^>]+>")
+SPACE_RE = re.compile(r"\s+")
+
+
+def clean_text(text: Optional[str]) -> str:
+    """
+        Return (str): the text without HTML tags and entities, with collapsed whitespace.
+    """
+    if not text:
+        return ""
+    return SPACE_RE.sub(" ", html.unescape(TAG_RE.sub(" ", text))).strip()
+
+
+def parse_date(value: Optional[str]) -> Optional[datetime]:
+    """
+        Parse an RFC 822 (RSS) or ISO 8601 (Atom) date into an aware datetime, UTC if no zone is given.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+class RSSSource(NewsSource):
+    """
+        An RSS 2.0 or Atom feed, parsed with the standard library.
+
+        Attributes:
+            feed_url (str): URL of the feed.
+    """
+    def __init__(self, feed_url: str, name: Optional[str] = None) -> None:
+        self.feed_url = feed_url
+        self.name = name or f"rss:{feed_url}"
+
+    def url(self) -> str:
+        return self.feed_url
+
+    def parse(self, body: bytes) -> List[NewsItem]:
+        root = ElementTree.fromstring(body)
+        if root.tag == f"{ATOM}feed":
+            return self._parse_atom(root)
+        return self._parse_rss(root)
+
+    def _parse_rss(self, root: ElementTree.Element) -> List[NewsItem]:
+        items: List[NewsItem] = []
+        for entry in root.iter("item"):
+            link = (entry.findtext("link") or "").strip()
+            created_at = parse_date(entry.findtext("pubDate"))
+            if not link or created_at is None:
+                logger.debug(f"Skipping feed item without link or date in {self.name}")
+                continue
+            thumbnail = None
+            # Elements without children are falsy, so no `or` between the lookups
+            media = entry.find(f"{MEDIA}thumbnail")
+            if media is None:
+                media = entry.find(f"{MEDIA}content")
+            enclosure = entry.find("enclosure")
+            if media is not None:
+                thumbnail = media.get("url")
+            elif enclosure is not None and (enclosure.get("type") or "").startswith("image/"):
+                thumbnail = enclosure.get("url")
+            items.append(NewsItem(
+                url=link,
+                title=clean_text(entry.findtext("title")),
+                description=clean_text(entry.findtext("description")),
+                created_at=created_at,
+                thumbnail=thumbnail,
+                source=self.name,
+            ))
+        return items
+
+    def _parse_atom(self, root: ElementTree.Element) -> List[NewsItem]:
+        items: List[NewsItem] = []
+        for entry in root.iter(f"{ATOM}entry"):
+            link = ""
+            for element in entry.findall(f"{ATOM}link"):
+                if element.get("rel", "alternate") == "alternate" and element.get("href"):
+                    link = element.get("href", "").strip()
+                    break
+            created_at = parse_date(entry.findtext(f"{ATOM}published") or entry.findtext(f"{ATOM}updated"))
+            if not link or created_at is None:
+                logger.debug(f"Skipping feed entry without link or date in {self.name}")
+                continue
+            items.append(NewsItem(
+                url=link,
+                title=clean_text(entry.findtext(f"{ATOM}title")),
+                description=clean_text(entry.findtext(f"{ATOM}summary") or entry.findtext(f"{ATOM}content")),
+                created_at=created_at,
+                source=self.name,
+            ))
+        return items
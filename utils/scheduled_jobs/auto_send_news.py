@@ -1,68 +1,366 @@
-from typing import List, Optional, Union
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
 
 import asyncio
+from decouple import config
 
-from db_peewee.db_users_class import UserDB
+from db_peewee.db_outbox_class import (
+    DELIVERED, FAILED,
+    claim_deliveries, enqueue_deliveries, get_digest, initialize_outbox_db, load_digest_chunks,
+    mark_deliveries, mark_digest_planned, prune_outbox, release_claimed, save_digest_chunks,
+    start_digest, unfinished_digests,
+)
+from db_peewee.db_news_class import NewsDB
+from db_peewee.db_users_class import deactivate_users, get_distinct_keywords, iter_user_batches
+from db_peewee.repository import run_write
 from telegram_bot.create_bot import bot
+from utils.broadcaster import Broadcaster, BroadcastJob
 from utils.data_sort import split_messages
+from utils.keyword_matcher import KeywordMatcher, Phrase, match_texts, normalize_keyword
 from utils.logger_config import logger
-from utils.news_sort import get_all_daily, get_key_daily
+from utils.news_cache import news_cache
+from utils.news_sort import get_all_daily, get_daily_news, get_key_daily, set_links
 
-async def send_news_to_user(user: UserDB) -> None:
+BROADCAST_PAGE_SIZE: int = config('BROADCAST_PAGE_SIZE', default=1000, cast=int)
+OUTBOX_CLAIM_SIZE: int = config('OUTBOX_CLAIM_SIZE', default=200, cast=int)
+OUTBOX_RETENTION_DAYS: int = config('OUTBOX_RETENTION_DAYS', default=7, cast=int)
+
+# Held while a digest is sent by this process, by digest id
+_digest_locks: Dict[str, asyncio.Lock] = {}
+
+# (news_choice, language_code, normalized keywords or None)
+DigestKey = Tuple[str, str, Optional[Tuple[str, ...]]]
+
+
+def digest_key(choice: Optional[str], lang_code: Optional[str], keywords: Optional[str]) -> DigestKey:
     """
-        Send news messages to a single user based on their preferences.
+        Build the key of the digest a user receives, so users with equal settings share one digest.
 
         Args:
-            user (UserDB): User database model instance containing user preferences.
+            choice (Optional[str]): User news choice ('news_all' or 'news_keyword').
+            lang_code (Optional[str]): User language code.
+            keywords (Optional[str]): Comma separated keywords for 'news_keyword'.
 
         Returns:
-            None
+            DigestKey: Normalized (choice, lang_code, keywords) tuple.
     """
-    try:
-        chat_id: int = user.user_id
-        choice: str = user.news_choice
-        keywords: Optional[Union[str, List[str]]] = user.news_keywords
-        lang_code: str = user.language_code
-
-        if choice == "news_all":
-            news_messages: List[str] = get_all_daily(lang_code=lang_code)
-        elif choice == "news_keyword" and keywords:
-            keys_list: List[str] = [k.strip() for k in keywords.split(",") if k.strip()]
-            news_messages = get_key_daily(keys_list, lang_code=lang_code)
+    lang_code = lang_code or "en"
+    if choice == "news_keyword" and keywords:
+        keys: Tuple[str, ...] = tuple(sorted({k.strip().lower() for k in keywords.split(",") if k.strip()}))
+        if keys:
+            return "news_keyword", lang_code, keys
+    # If no choice is made, send default news
+    return "news_all", lang_code, None
+
+
+def group_key_str(key: DigestKey) -> str:
+    """
+        Serialize a digest key for storage in the outbox.
+
+        Args:
+            key (DigestKey): Digest key built by digest_key.
+
+        Returns:
+            str: For example 'news_keyword|en|ai,bitcoin'.
+    """
+    choice, lang_code, keys = key
+    return f"{choice}|{lang_code}|{','.join(keys or ())}"
+
+
+class KeywordIndex:
+    """
+        Keyword matches of today's news for every keyword subscriber, computed once per broadcast.
+        All distinct keywords are compiled into one automaton that scans each English text once.
+
+        Attributes:
+            news (List[NewsDB]): Today's news in English, newest first.
+            matches (Dict[Phrase, Set[int]]): News ids by keyword phrase.
+    """
+    def __init__(self) -> None:
+        self.matcher = KeywordMatcher(get_distinct_keywords())
+        self.news: List[NewsDB] = get_daily_news("en")
+        texts: Dict[int, str] = {
+            news.id: f"{news.title or ''}\n{news.description or ''}" for news in self.news
+        }
+        self.matches: Dict[Phrase, Set[int]] = match_texts(self.matcher, texts)
+        self._by_lang: Dict[str, List[NewsDB]] = {"en": self.news}
+        logger.info(f"Keyword index: {len(self.matcher.phrases)} keywords over {len(self.news)} news, "
+                    f"{len(self.matches)} keywords matched")
+
+    def get_news(self, keys: Tuple[str, ...], lang_code: str) -> Optional[List[NewsDB]]:
+        """
+            Return today's news matching any of the keywords in the given language, newest first.
+
+            Args:
+                keys (Tuple[str, ...]): Keywords of a digest.
+                lang_code (str): Language of the digest.
+
+            Returns:
+                Optional[List[NewsDB]]: Matching news, or None if a keyword was not compiled
+                (the user changed keywords after the index was built).
+        """
+        news_ids: Set[int] = set()
+        for key in keys:
+            phrase = normalize_keyword(key)
+            if not phrase:
+                continue
+            if phrase not in self.matcher.phrases:
+                return None
+            news_ids |= self.matches.get(phrase, set())
+
+        if lang_code not in self._by_lang:
+            self._by_lang[lang_code] = get_daily_news(lang_code)
+        return [news for news in self._by_lang[lang_code] if news.id in news_ids]
+
+
+class DigestPlanner:
+    """
+        Renders each digest once per broadcast and reuses it for every user with the same key.
+        With a digest_id the rendered messages are stored in the outbox, so a resumed run
+        sends exactly the same text. Keyword digests are rendered from a KeywordIndex
+        built on the first keyword group.
+
+        Attributes:
+            digest_id (Optional[str]): Identifier of the newsletter run.
+            digests (Dict[DigestKey, List[str]]): Rendered messages by digest key.
+    """
+    def __init__(self, digest_id: Optional[str] = None) -> None:
+        self.digest_id: Optional[str] = digest_id
+        self.digests: Dict[DigestKey, List[str]] = {}
+        self._keyword_index: Optional[KeywordIndex] = None
+
+    def keyword_news(self, keys: Tuple[str, ...], lang_code: str) -> List[str]:
+        """
+            Return formatted keyword news for a digest, using the broadcast-wide KeywordIndex.
+
+            Args:
+                keys (Tuple[str, ...]): Keywords of the digest.
+                lang_code (str): Language of the digest.
+
+            Returns:
+                List[str]: Formatted news strings.
+        """
+        if self._keyword_index is None:
+            self._keyword_index = KeywordIndex()
+
+        news = self._keyword_index.get_news(keys, lang_code)
+        if news is None:
+            return get_key_daily(list(keys), lang_code=lang_code)
+        return set_links(lang_code=lang_code, query=news)
+
+    def messages_for(self, key: DigestKey) -> List[str]:
+        """
+            Return the messages of a digest, querying the news database only on the first call.
+
+            Args:
+                key (DigestKey): Digest key built by digest_key.
+
+            Returns:
+                List[str]: Messages ready to be sent, split by the Telegram length limit.
+        """
+        if key in self.digests:
+            return self.digests[key]
+
+        stored: Optional[List[str]] = None
+        if self.digest_id:
+            stored = load_digest_chunks(self.digest_id, group_key_str(key))
+
+        if stored is not None:
+            messages: List[str] = stored
         else:
-            # If no choice is made, send default news
-            news_messages = get_all_daily(lang_code=lang_code)
+            choice, lang_code, keys = key
+            if choice == "news_keyword":
+                news_messages: List[str] = self.keyword_news(keys, lang_code)
+            else:
+                news_messages = get_all_daily(lang_code=lang_code)
+            messages = split_messages(news_messages)
+            if self.digest_id:
+                save_digest_chunks(self.digest_id, group_key_str(key), messages)
 
-        messages: List[str] = split_messages(news_messages)
-        for msg in messages:
-            await bot.send_message(chat_id, msg, parse_mode="Markdown")
+        self.digests[key] = messages
+        return messages
 
-    except Exception as e:
-        logger.error(f"Error sending news to the user {UserDB.user_id}: {e}")
 
+def plan_digest(digest_id: str, page_size: int = BROADCAST_PAGE_SIZE) -> None:
+    """
+        Create pending outbox rows of a newsletter run for every user.
+        Users are read with keyset pagination and every page is written in one transaction.
+        Rows that already exist are kept, so planning an interrupted run again is safe.
+
+        Args:
+            digest_id (str): Identifier of the newsletter run.
+            page_size (int): Number of users read from the database at once.
+    """
+    planner = DigestPlanner(digest_id)
+    users = 0
+
+    for page in iter_user_batches(page_size):
+        deliveries: List[Tuple[int, str, int]] = []
+        for user_id, choice, lang_code, keywords in page:
+            users += 1
+            key: DigestKey = digest_key(choice, lang_code, keywords)
+            try:
+                messages: List[str] = planner.messages_for(key)
+            except Exception as e:
+                logger.error(f"Error preparing digest {key} for the user {user_id}: {e}")
+                planner.digests[key] = []
+                continue
+
+            group_key = group_key_str(key)
+            deliveries.extend((user_id, group_key, idx) for idx in range(len(messages)))
+        enqueue_deliveries(digest_id, deliveries)
 
-async def send_news_to_all_users() -> None:
+    mark_digest_planned(digest_id)
+    logger.info(f"Digest '{digest_id}' planned: {users} users in {len(planner.digests)} digests")
+
+
+class OutboxTracker:
+    """
+        Collects results of finished broadcast jobs and writes them to the outbox in bulk.
+        Users whose chats turned out to be unreachable are deactivated in the same flush.
+
+        Attributes:
+            flush_size (int): Number of buffered rows that triggers a flush.
+    """
+    def __init__(self, flush_size: int = 500) -> None:
+        self.flush_size: int = flush_size
+        self._delivered: List[int] = []
+        self._failed: List[int] = []
+        self._unreachable: List[int] = []
+
+    def on_finished(self, job: BroadcastJob, delivered: bool) -> None:
+        """
+            Broadcaster callback; job.ref holds the outbox row ids in message order.
+        """
+        row_ids: List[int] = job.ref
+        self._delivered.extend(row_ids[:job.sent])
+        self._failed.extend(row_ids[job.sent:])
+        if job.unreachable:
+            self._unreachable.append(job.chat_id)
+
+    @property
+    def buffered(self) -> int:
+        return len(self._delivered) + len(self._failed) + len(self._unreachable)
+
+    async def flush(self) -> None:
+        """
+            Writes buffered statuses, one transaction per status, and deactivates unreachable users.
+        """
+        delivered, self._delivered = self._delivered, []
+        failed, self._failed = self._failed, []
+        unreachable, self._unreachable = self._unreachable, []
+        await asyncio.to_thread(mark_deliveries, delivered, DELIVERED)
+        await asyncio.to_thread(mark_deliveries, failed, FAILED)
+        await run_write(deactivate_users, unreachable)
+
+
+async def iter_outbox_jobs(digest_id: str, tracker: OutboxTracker) -> AsyncIterator[BroadcastJob]:
+    """
+        Stream broadcast jobs from pending outbox rows, claimed in batches of users.
+
+        Args:
+            digest_id (str): Identifier of the newsletter run.
+            tracker (OutboxTracker): Tracker flushed before every claim.
+
+        Returns:
+            AsyncIterator[BroadcastJob]: Jobs for the broadcaster.
+    """
+    while True:
+        if tracker.buffered >= tracker.flush_size:
+            await tracker.flush()
+
+        claimed = await asyncio.to_thread(claim_deliveries, digest_id, OUTBOX_CLAIM_SIZE)
+        if not claimed:
+            return
+
+        for user_id, rows in claimed.items():
+            yield BroadcastJob(user_id, [text for _, text in rows], ref=[row_id for row_id, _ in rows])
+
+
+async def send_digest(digest_id: str, resume: bool = False) -> None:
+    """
+        Send a newsletter run through the outbox: plan it if needed, then deliver what is left.
+        Runs of the same digest are serialized, so a resume and a scheduled run never send it twice.
+
+        Args:
+            digest_id (str): Identifier of the newsletter run.
+            resume (bool): True after a restart: rows left 'sending' by the previous process are sent again.
+
+        Returns:
+            None
+    """
+    lock = _digest_locks.setdefault(digest_id, asyncio.Lock())
+    async with lock:
+        digest = await asyncio.to_thread(get_digest, digest_id)
+        if digest is None:
+            await asyncio.to_thread(start_digest, digest_id)
+        if digest is None or not digest.planned:
+            await asyncio.to_thread(plan_digest, digest_id)
+
+        if resume:
+            released = await asyncio.to_thread(release_claimed, digest_id)
+            if released:
+                logger.info(f"Digest '{digest_id}': {released} interrupted deliveries are pending again")
+
+        tracker = OutboxTracker()
+        broadcaster = Broadcaster(bot, on_finished=tracker.on_finished)
+        try:
+            await broadcaster.run(iter_outbox_jobs(digest_id, tracker))
+        finally:
+            await tracker.flush()
+
+
+async def send_news_to_all_users(digest_name: str = "manual") -> None:
+    """
+        Send today's digest to all users in the database through the outbox.
+        A run that was already delivered is not sent again.
+
+        Args:
+            digest_name (str): Name of the run within the day, for example 'morning'.
+
+        Returns:
+            None
     """
-        Send news to all users in the database concurrently.
+    digest_id = f"{datetime.now():%Y-%m-%d}-{digest_name}"
+    await send_digest(digest_id)
+    await asyncio.to_thread(prune_outbox, OUTBOX_RETENTION_DAYS)
+
+
+async def resume_pending_broadcasts() -> None:
+    """
+        Resume today's newsletter runs interrupted by a restart, delivering only what is left.
+        Older runs are not resumed, their news is outdated.
 
         Returns:
             None
     """
-    users = UserDB.select()
-    tasks = [send_news_to_user(user) for user in users]
-    await asyncio.gather(*tasks)  # Run sending asynchronously
+    try:
+        await asyncio.to_thread(initialize_outbox_db)
+        today = f"{datetime.now():%Y-%m-%d}-"
+        for digest_id in await asyncio.to_thread(unfinished_digests):
+            if not digest_id.startswith(today):
+                continue
+            logger.info(f"Resuming interrupted newsletter '{digest_id}'")
+            await send_digest(digest_id, resume=True)
+    except Exception as e:
+        logger.error(f"Error resuming newsletters: {e}")
 
 
-async def schedule_news_send() -> None:
+async def schedule_news_send(digest_name: str = "manual") -> None:
     """
         Schedule the news sending process, logging start and completion.
 
+        Args:
+            digest_name (str): Name of the run within the day, for example 'morning'.
+
         Returns:
             None
     """
     try:
         logger.info("Start of the newsletter")
-        await send_news_to_all_users()
+        await asyncio.to_thread(initialize_outbox_db)
+        await send_news_to_all_users(digest_name)
         logger.info("The newsletter has been completed")
+        logger.info(f"News query cache: {news_cache.stats()}")
     except Exception as e:
-        logger.error(f"Newsletter error: {e}")
\ No newline at end of file
+        logger.error(f"Newsletter error: {e}")
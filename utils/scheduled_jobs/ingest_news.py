@@ -0,0 +1,205 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+import asyncio
+from decouple import config
+from peewee import chunked
+
+from db_peewee.db_news_class import (
+    NewsDB, NewsTranslation, find_near_duplicate, initialize_news_db, load_quota_usage, load_source_states,
+    news_db, news_ids_by_url, save_fingerprints, save_quota_usage, save_source_states,
+)
+from db_peewee.repository import run_read, run_write
+from utils.http_client import close_http_session
+from utils.logger_config import logger
+from utils.near_duplicates import NEAR_DUP_DAYS, NEAR_DUP_DISTANCE, fingerprint_news, hamming
+from utils.news_cache import bump_news_generation
+from utils.news_sources import NewsItem, NewsSource, build_sources, rapid_quota
+
+# Rows per INSERT statement, below SQLite's limit on bound variables
+INGEST_WRITE_BATCH: int = config('INGEST_WRITE_BATCH', default=100, cast=int)
+
+
+class IngestResult:
+    """
+        Outcome of an ingest run.
+
+        Attributes:
+            news_ids (List[int]): Ids of the inserted NewsDB rows.
+            refused (List[str]): Names of the sources skipped because the request quota is used up.
+            failed (List[str]): Names of the sources whose request failed.
+    """
+    __slots__ = ("news_ids", "refused", "failed")
+
+    def __init__(
+            self,
+            news_ids: Optional[List[int]] = None,
+            refused: Optional[List[str]] = None,
+            failed: Optional[List[str]] = None
+    ) -> None:
+        self.news_ids: List[int] = news_ids or []
+        self.refused: List[str] = refused or []
+        self.failed: List[str] = failed or []
+
+
+async def ingest_news(sources: Optional[List[NewsSource]] = None, reserved: bool = False) -> IngestResult:
+    """
+        Fetch all news sources concurrently through the shared HTTP session and save the new items
+        into the database on the writer thread. Sources send ETag/Last-Modified of their previous
+        response, so unchanged feeds answer with a cheap 304. Quota-limited sources are skipped
+        once the day's request budget is spent; the usage is stored before the requests are made.
+
+        Args:
+            sources (Optional[List[NewsSource]]): Sources to fetch; the configured ones if None.
+            reserved (bool): True for a digest, which may spend the requests reserved for digests.
+
+        Returns:
+            IngestResult: Ids of the inserted NewsDB rows, handed on to translation, and the sources
+            that were refused by the quota or failed.
+    """
+    sources = sources if sources is not None else build_sources()
+    result = IngestResult()
+    if not sources:
+        return result
+    await run_write(initialize_news_db)
+
+    if any(source.quota_limited for source in sources):
+        if not rapid_quota.restored:
+            stored = await run_read(load_quota_usage, rapid_quota.name)
+            rapid_quota.restore(*(stored or rapid_quota.usage()))
+        allowed: List[NewsSource] = []
+        for source in sources:
+            if source.quota_limited and not rapid_quota.try_spend(reserved):
+                # Expected for polls once the spare requests are spent; a digest without them is not
+                if reserved:
+                    logger.warning(f"Daily request quota used up, skipping news source {source.name}")
+                else:
+                    logger.info(f"Daily request quota used up, skipping news source {source.name}")
+                result.refused.append(source.name)
+                continue
+            allowed.append(source)
+        await run_write(save_quota_usage, rapid_quota.name, *rapid_quota.usage())
+        sources = allowed
+        if not sources:
+            return result
+
+    states = await run_read(load_source_states, [source.name for source in sources])
+
+    logger.info(f"Fetching {len(sources)} news sources")
+    fetched = await asyncio.gather(
+        *(source.fetch(*states.get(source.name, (None, None))) for source in sources),
+        return_exceptions=True
+    )
+
+    items: List[NewsItem] = []
+    new_states: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+    for source, source_result in zip(sources, fetched):
+        if isinstance(source_result, Exception):
+            logger.error(f"Error when requesting news source {source.name}: {source_result!r}")
+            result.failed.append(source.name)
+            continue
+        if source_result.items is None:
+            logger.info(f"News source {source.name} not modified")
+            continue
+        logger.info(f"Total number of news received from {source.name}: {len(source_result.items)}")
+        items.extend(source_result.items)
+        if source_result.etag or source_result.last_modified:
+            new_states[source.name] = (source_result.etag, source_result.last_modified)
+
+    result.news_ids = await run_write(save_news_items, items)
+    # Validators are stored only after the items are, so a failed save is fetched again in full
+    await run_write(save_source_states, new_states)
+    return result
+
+
+def save_news_items(news_items: List[NewsItem]) -> List[int]:
+    """
+        Filter out existing news by URL and near-duplicates of the last NEAR_DUP_DAYS days
+        (see utils.near_duplicates), and save today's new news items into the database.
+        Existence checks use the unique URL index for the batch only, and rows are written
+        with insert_many in one transaction, so the cost follows the batch and not news.db.
+
+        Args:
+            news_items (List[NewsItem]): Items of all sources.
+
+        Returns:
+            List[int]: Ids of the inserted NewsDB rows.
+    """
+    today = datetime.now(timezone.utc).date()
+
+    # The same story can come from several sources, the first one is kept
+    candidates: Dict[str, NewsItem] = {}
+    for item in news_items:
+        if item.created_at.astimezone(timezone.utc).date() == today:
+            candidates.setdefault(item.url, item)
+
+    if not candidates:
+        logger.info("New news to save (today only): 0")
+        return []
+
+    since = datetime.now() - timedelta(days=NEAR_DUP_DAYS)
+    with news_db.atomic():
+        existing_urls = news_ids_by_url(list(candidates))
+
+        new_news: List[Tuple[NewsItem, str, int]] = []
+        skipped = 0
+        for url, item in candidates.items():
+            if url in existing_urls:
+                continue
+            canonical, fingerprint = fingerprint_news(item.url, item.title, item.description)
+            duplicate_id = find_near_duplicate(canonical, fingerprint, since, NEAR_DUP_DISTANCE)
+            if duplicate_id is not None or _duplicate_in_batch(canonical, fingerprint, new_news):
+                logger.info(f"Skipping near-duplicate news: url={item.url}, source={item.source}")
+                skipped += 1
+                continue
+            new_news.append((item, canonical, fingerprint))
+
+        logger.info(f"New news to save (today only): {len(new_news)}")
+        if skipped:
+            logger.info(f"Near-duplicate news skipped: {skipped}")
+        if not new_news:
+            return []
+
+        for batch in chunked(new_news, INGEST_WRITE_BATCH):
+            NewsDB.insert_many([
+                {'url': item.url, 'thumbnail': item.thumbnail, 'createdat': item.created_at}
+                for item, _, _ in batch
+            ]).on_conflict_ignore().execute()
+
+        ids = news_ids_by_url([item.url for item, _, _ in new_news])
+        for batch in chunked(new_news, INGEST_WRITE_BATCH):
+            NewsTranslation.insert_many([
+                {'news': ids[item.url], 'lang': 'en', 'title': item.title, 'description': item.description}
+                for item, _, _ in batch
+            ]).on_conflict_ignore().execute()
+        save_fingerprints([
+            (ids[item.url], canonical, fingerprint, item.created_at)
+            for item, canonical, fingerprint in new_news
+        ])
+
+    for item, _, _ in new_news:
+        logger.info(f"Inserted news: url={item.url}, title_en={item.title}, source={item.source}")
+
+    bump_news_generation()
+    logger.info("News are saved to the database")
+    return [ids[item.url] for item, _, _ in new_news]
+
+
+def _duplicate_in_batch(canonical: str, fingerprint: int, accepted: List[Tuple[NewsItem, str, int]]) -> bool:
+    """
+        Return (bool): True if an item already accepted in this batch has the same canonical URL or a close SimHash.
+    """
+    return any(
+        canonical == other_canonical
+        or (fingerprint and other and hamming(fingerprint, other) <= NEAR_DUP_DISTANCE)
+        for _, other_canonical, other in accepted
+    )
+
+async def _main() -> None:
+    try:
+        await ingest_news()
+    finally:
+        await close_http_session()
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -0,0 +1,140 @@
+"""
+Event-driven ingest -> translate -> deliver pipeline.
+
+Instead of fixed cron offsets between the stages, every news item inserted by the ingest
+is put on an asyncio queue at once and translation workers pick it up immediately.
+The digest waits on the queue: it is sent as soon as the news ingested for it are translated,
+and never with untranslated news while translation is still running.
+"""
+
+from typing import List, Optional
+
+import asyncio
+from decouple import config
+
+from utils.logger_config import logger
+from utils.news_sources import NewsSource, build_sources
+from utils.scheduled_jobs.auto_send_news import schedule_news_send
+from utils.scheduled_jobs.translate_to_lang_db import fill_translated_news_async, translate_news
+from utils.scheduled_jobs.ingest_news import IngestResult, ingest_news
+
+PIPELINE_TRANSLATE_WORKERS: int = config('PIPELINE_TRANSLATE_WORKERS', default=2, cast=int)
+PIPELINE_TRANSLATE_BATCH: int = config('PIPELINE_TRANSLATE_BATCH', default=50, cast=int)
+# Longest wait of a digest for translations before it is sent anyway
+PIPELINE_DIGEST_WAIT: int = config('PIPELINE_DIGEST_WAIT', default=900, cast=int)
+
+
+class NewsPipeline:
+    """
+        Connects ingest, translation and delivery through an asyncio queue of news ids.
+
+        Attributes:
+            workers (int): Number of translation workers.
+            batch_size (int): Maximum number of news ids translated together.
+            queue (Optional[asyncio.Queue]): News ids waiting for translation.
+    """
+    def __init__(self, workers: int = PIPELINE_TRANSLATE_WORKERS, batch_size: int = PIPELINE_TRANSLATE_BATCH) -> None:
+        self.workers: int = max(1, workers)
+        self.batch_size: int = max(1, batch_size)
+        self.queue: Optional["asyncio.Queue[int]"] = None
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        """
+            Start the translation workers on the running event loop.
+        """
+        if self.queue is not None:
+            return
+        self.queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._translate_worker()) for _ in range(self.workers)]
+        logger.info(f"News pipeline started with {self.workers} translation workers")
+
+    async def stop(self) -> None:
+        """
+            Stop the translation workers; news left in the queue are translated by the next warm-up.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self.queue = None
+
+    async def ingest(self, sources: Optional[List[NewsSource]] = None, reserved: bool = False) -> IngestResult:
+        """
+            Fetch news and hand every inserted item to the translation workers.
+
+            Args:
+                sources (Optional[List[NewsSource]]): Sources to fetch; all configured ones if None.
+                reserved (bool): True for a digest, which may spend the API requests reserved for digests.
+
+            Returns:
+                IngestResult: Ids of the inserted news and the refused and failed sources.
+        """
+        self.start()
+        result = await ingest_news(sources, reserved)
+        for news_id in result.news_ids:
+            self.queue.put_nowait(news_id)
+        if result.news_ids:
+            logger.info(f"Pipeline: {len(result.news_ids)} new news queued for translation")
+        return result
+
+    async def _translate_worker(self) -> None:
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            try:
+                saved = await translate_news(batch)
+                logger.info(f"Pipeline: translated {len(batch)} news, {saved} translations saved")
+            except Exception as e:
+                logger.error(f"Pipeline: error translating news {batch}: {e}")
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    async def translated(self, timeout: float = PIPELINE_DIGEST_WAIT) -> bool:
+        """
+            Wait until every queued news item is translated.
+
+            Args:
+                timeout (float): Maximum wait in seconds.
+
+            Returns:
+                bool: False if the wait timed out.
+        """
+        self.start()
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            logger.warning(f"Pipeline: translations not finished after {timeout}s, "
+                           f"{self.queue.qsize()} news still queued")
+            return False
+
+    async def warm_up(self) -> None:
+        """
+            Startup warm-up: translate what a previous run left untranslated, then ingest fresh news
+            and wait for their translation. Quota-limited sources are left to the adaptive poller,
+            so a restart doesn't cost API requests outside the daily budget's pacing.
+        """
+        self.start()
+        await fill_translated_news_async()
+        await self.ingest([source for source in build_sources() if not source.quota_limited])
+        await self.translated()
+
+    async def run_digest(self, digest_name: str = "manual") -> None:
+        """
+            Ingest fresh news, wait for their translation and send the digest right away.
+
+            Args:
+                digest_name (str): Name of the run, e.g. "morning" or "evening".
+        """
+        try:
+            await self.ingest(reserved=True)
+        except Exception as e:
+            logger.error(f"Pipeline: error ingesting news before the {digest_name} digest: {e}")
+        await self.translated()
+        await schedule_news_send(digest_name)
+
+
+news_pipeline = NewsPipeline()
@@ -0,0 +1,172 @@
+"""
+Adaptive polling of the news sources between the digests.
+
+Each source keeps an exponentially weighted moving average of its new-item rate. The next poll
+is planned so that about POLL_TARGET_ITEMS new items are expected by then: a source with news
+flowing is polled more often, a quiet one backs off, within POLL_MIN_INTERVAL..POLL_MAX_INTERVAL.
+Quota-limited sources are additionally paced by the daily request budget (utils.news_sources.quota);
+they are not fetched by the warm-up, so their first poll is due at start. Polls that were refused
+by the quota or failed say nothing about the news flow and leave the rate as it was.
+New items go to the pipeline queue and are translated right away, so the digest finds them ready.
+"""
+
+from typing import Dict, List, Optional
+import time
+
+import asyncio
+from decouple import config
+
+from utils.logger_config import logger
+from utils.news_sources import NewsSource, build_sources, rapid_quota
+from utils.scheduled_jobs.pipeline import NewsPipeline, news_pipeline
+
+POLL_MIN_INTERVAL: int = config('POLL_MIN_INTERVAL', default=600, cast=int)
+POLL_MAX_INTERVAL: int = config('POLL_MAX_INTERVAL', default=14400, cast=int)
+POLL_TARGET_ITEMS: float = config('POLL_TARGET_ITEMS', default=2.0, cast=float)
+# Weight of the latest observation in the new-item rate
+POLL_EWMA_ALPHA: float = config('POLL_EWMA_ALPHA', default=0.3, cast=float)
+
+
+class SourceSchedule:
+    """
+        Polling state of a news source.
+
+        Attributes:
+            source (NewsSource): The source.
+            rate (Optional[float]): Smoothed new items per hour, None until two polls were made.
+            last_poll (Optional[float]): Monotonic time of the last poll, None if the source was not fetched yet.
+            next_poll (float): Monotonic time of the next poll.
+    """
+    __slots__ = ("source", "rate", "last_poll", "next_poll")
+
+    def __init__(self, source: NewsSource, now: float, fetched: bool = True) -> None:
+        """
+            Args:
+                source (NewsSource): The source.
+                now (float): Monotonic time of the start.
+                fetched (bool): True if the source was just fetched, so its first poll can wait.
+        """
+        self.source = source
+        self.rate: Optional[float] = None
+        self.last_poll: Optional[float] = now if fetched else None
+        self.next_poll = now + POLL_MIN_INTERVAL if fetched else now
+
+    def observe(self, new_items: int, now: float) -> None:
+        """
+            Fold the new items of a poll into the smoothed rate. The first fetch of a source only
+            starts the measurement, as its items piled up over an unknown time.
+        """
+        if self.last_poll is None:
+            self.last_poll = now
+            return
+        hours = max(now - self.last_poll, 1.0) / 3600
+        observed = new_items / hours
+        if self.rate is None:
+            self.rate = observed
+        else:
+            self.rate = POLL_EWMA_ALPHA * observed + (1 - POLL_EWMA_ALPHA) * self.rate
+        self.last_poll = now
+
+    def interval(self) -> float:
+        """
+            Return (float): seconds until about POLL_TARGET_ITEMS new items are expected, within the bounds.
+        """
+        if not self.rate:
+            return float(POLL_MAX_INTERVAL)
+        return min(max(POLL_TARGET_ITEMS / self.rate * 3600, POLL_MIN_INTERVAL), POLL_MAX_INTERVAL)
+
+
+class AdaptivePoller:
+    """
+        Background task polling each news source when its schedule is due.
+
+        Attributes:
+            pipeline (NewsPipeline): Pipeline the new items are queued on.
+            schedules (List[SourceSchedule]): Polling state of the configured sources.
+    """
+    def __init__(self, pipeline: NewsPipeline = news_pipeline) -> None:
+        self.pipeline = pipeline
+        self.schedules: List[SourceSchedule] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self, sources: Optional[List[NewsSource]] = None) -> None:
+        """
+            Start polling on the running event loop. The first polls are due after POLL_MIN_INTERVAL,
+            as the warm-up has just fetched the sources, except for the quota-limited ones, which
+            the warm-up leaves out and which are polled at once.
+
+            Args:
+                sources (Optional[List[NewsSource]]): Sources to poll; the configured ones if None.
+        """
+        if self._task is not None:
+            return
+        now = time.monotonic()
+        sources = sources if sources is not None else build_sources()
+        self.schedules = [SourceSchedule(source, now, fetched=not source.quota_limited) for source in sources]
+        if not self.schedules:
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Adaptive polling started for {len(self.schedules)} news sources")
+
+    async def stop(self) -> None:
+        """
+            Stop polling.
+        """
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            now = time.monotonic()
+            due = [schedule for schedule in self.schedules if schedule.next_poll <= now]
+            if not due:
+                await asyncio.sleep(min(schedule.next_poll for schedule in self.schedules) - now)
+                continue
+            for schedule in due:
+                await self._poll(schedule)
+
+    async def _poll(self, schedule: SourceSchedule) -> None:
+        try:
+            result = await self.pipeline.ingest([schedule.source])
+        except Exception as e:
+            logger.error(f"Adaptive polling: error fetching {schedule.source.name}: {e}")
+            result = None
+
+        now = time.monotonic()
+        if result is None or result.failed:
+            outcome = "failed"
+        elif result.refused:
+            outcome = "was refused by the request quota"
+        else:
+            # Only a completed fetch tells how many news came in since the last one
+            schedule.observe(len(result.news_ids), now)
+            outcome = f"had {len(result.news_ids)} new news"
+        interval = schedule.interval()
+        if schedule.source.quota_limited:
+            quota_sources = sum(1 for other in self.schedules if other.source.quota_limited)
+            interval = max(interval, rapid_quota.pacing_interval(quota_sources))
+        schedule.next_poll = now + interval
+        rate = "unknown" if schedule.rate is None else f"{schedule.rate:.2f}/h"
+        logger.info(f"Adaptive polling: {schedule.source.name} {outcome}, "
+                    f"rate {rate}, next poll in {interval / 60:.0f} min")
+
+    def stats(self) -> Dict[str, dict]:
+        """
+            Return (Dict[str, dict]): rate and seconds to the next poll of each source, and the quota.
+        """
+        now = time.monotonic()
+        stats: Dict[str, dict] = {
+            schedule.source.name: {
+                "rate": schedule.rate,
+                "next_poll_in": round(max(schedule.next_poll - now, 0.0)),
+            }
+            for schedule in self.schedules
+        }
+        stats["quota"] = rapid_quota.stats()
+        return stats
+
+
+news_poller = AdaptivePoller()
@@ -1,79 +1,190 @@
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
+import time
 
 import asyncio
+from decouple import config
+from peewee import JOIN, chunked, fn
 
-from db_peewee.db_news_class import NewsDB,news_db
+from db_peewee.db_news_class import NewsTranslation, news_db
+from db_peewee.repository import run_read, run_write
 from utils.languages import LANGUAGES
 from utils.logger_config import logger
-from utils.translator import translate_text
+from utils.news_cache import bump_news_generation
+from utils.translation_memory import translation_memory
+from utils.translator import TranslationLimiter, get_limiter, translate_many_async
 
-def fill_translated_news() -> None:
+TRANSLATION_WRITE_BATCH: int = config('TRANSLATION_WRITE_BATCH', default=200, cast=int)
+
+PendingTranslation = Tuple[int, Optional[str], Optional[str]]
+
+
+def load_pending_translations(
+        lang_codes: List[str],
+        news_ids: Optional[List[int]] = None
+) -> Dict[str, List[PendingTranslation]]:
     """
-    Translates news from English data in database (title_en, description_en) into all languages from LANGUAGES,
-    except 'en', and fills the corresponding fields in the database.
+    Return the English originals missing a translation (no row, or its title is NULL or empty),
+    for every target language, read with one projection query: each English row is joined
+    with the languages it is already translated into. News without English text are skipped.
 
-    For each news item missing a translation in the target language (where title_{lang_code} is NULL or empty),
-    the function uses translate_text to translate and saves the result.
+    Args:
+        lang_codes (List[str]): Target language codes.
+        news_ids (Optional[List[int]]): Only these news items; all news if None.
 
-    Exceptions are not suppressed to allow error tracking in logs.
+    Returns:
+        Dict[str, List[PendingTranslation]]: (news_id, title, description) of the English originals per language.
+    """
+    Translated = NewsTranslation.alias()
+    query = (NewsTranslation
+             .select(
+                 NewsTranslation.news,
+                 NewsTranslation.title,
+                 NewsTranslation.description,
+                 fn.GROUP_CONCAT(Translated.lang)
+             )
+             .join(Translated, JOIN.LEFT_OUTER, on=(
+                 (Translated.news == NewsTranslation.news) &
+                 (Translated.lang != 'en') &
+                 (Translated.title.is_null(False)) &
+                 (Translated.title != '')
+             ))
+             .where(NewsTranslation.lang == 'en')
+             .group_by(NewsTranslation.id)
+             .tuples())
+    if news_ids is not None:
+        query = query.where(NewsTranslation.news.in_(news_ids))
+
+    pending: Dict[str, List[PendingTranslation]] = {lang_code: [] for lang_code in lang_codes}
+    for news_id, title, description, translated in query:
+        if not title and not description:
+            logger.debug(f"Skipping news with id={news_id} — no English text available.")
+            continue
+        done = set(translated.split(',')) if translated else set()
+        for lang_code in lang_codes:
+            if lang_code not in done:
+                pending[lang_code].append((news_id, title, description))
+    return pending
+
+
+def save_translations(lang_code: str, translations: List[PendingTranslation]) -> int:
+    """
+    Stores translated titles and descriptions as NewsTranslation rows of the language
+    with multi-row upserts in one transaction.
 
-    return: None
+    Args:
+        lang_code (str): Target language code.
+        translations (List[PendingTranslation]): (news_id, title, description) in the language.
+
+    Returns:
+        int: Number of saved rows.
+    """
+    rows = [
+        {'news': news_id, 'lang': lang_code, 'title': title, 'description': description}
+        for news_id, title, description in translations
+    ]
+    if not rows:
+        return 0
+    with news_db.atomic():
+        for batch in chunked(rows, TRANSLATION_WRITE_BATCH):
+            (NewsTranslation
+             .insert_many(batch)
+             .on_conflict(
+                 conflict_target=[NewsTranslation.news, NewsTranslation.lang],
+                 preserve=[NewsTranslation.title, NewsTranslation.description]
+             )
+             .execute())
+    bump_news_generation()
+    return len(rows)
+
+
+async def translate_language(lang_code: str, pending: List[PendingTranslation], limiter: TranslationLimiter) -> int:
+    """
+    Translates the missing news of one language in batches and saves them on the database writer thread.
+
+    Args:
+        lang_code (str): Target language code.
+        pending (List[PendingTranslation]): English originals to translate.
+        limiter (TranslationLimiter): Concurrency caps shared by all languages of the run.
+
+    Returns:
+        int: Number of saved translations.
+    """
+    total = len(pending)
+    logger.info(f"Starting translation to '{lang_code}'. Number of news items to translate: {total}")
+    if not total:
+        return 0
+
+    texts: List[str] = []
+    for _, title, description in pending:
+        texts.extend(t for t in (title, description) if t)
+    results = iter(await translate_many_async(texts, lang_code, limiter))
+
+    translations: List[PendingTranslation] = []
+    for news_id, title, description in pending:
+        translated_title: Optional[str] = next(results) if title else None
+        translated_description: Optional[str] = next(results) if description else None
+        if not translated_title and not translated_description:
+            logger.error(f"Error translating news with id={news_id} to '{lang_code}': no translation")
+            continue
+        translations.append((news_id, translated_title, translated_description))
+
+    saved = await run_write(save_translations, lang_code, translations)
+    logger.info(f"Translated {saved} of {total} news items to '{lang_code}'.")
+    return saved
+
+
+async def translate_news(news_ids: Optional[List[int]] = None, limiter: Optional[TranslationLimiter] = None) -> int:
+    """
+    Translates news from the English NewsTranslation rows into all languages from LANGUAGES,
+    except 'en', and stores a NewsTranslation row for each language.
+
+    Languages are translated concurrently, so the run takes about as long as the slowest language;
+    requests are capped by TRANSLATE_CONCURRENCY overall and TRANSLATE_PROVIDER_CONCURRENCY per provider
+    and failed requests are retried with backoff. Results are written on the database writer thread.
+
+    Args:
+        news_ids (Optional[List[int]]): Only these news items, e.g. just ingested ones; every untranslated news if None.
+        limiter (Optional[TranslationLimiter]): Caps to use; the process-wide ones if not given.
+
+    Returns:
+        int: Number of saved translations.
+    """
+    limiter = limiter or get_limiter()
+    languages = [lang_code for lang_code in LANGUAGES if lang_code != 'en']
+    pending = await run_read(load_pending_translations, languages, news_ids)
+    results = await asyncio.gather(
+        *(translate_language(lang_code, pending[lang_code], limiter) for lang_code in languages),
+        return_exceptions=True
+    )
+    saved = 0
+    for lang_code, result in zip(languages, results):
+        if isinstance(result, Exception):
+            logger.error(f"Error translating news to '{lang_code}': {result}")
+        else:
+            saved += result
+    return saved
+
+
+async def fill_translated_news_async() -> None:
+    """
+    Translates every news item still missing a translation, see translate_news.
     """
     logger.info("Starting translating news.")
-    if news_db.is_closed():
-        news_db.connect()
-    # logger.info("The connection to the news database was opened.")
+    started = time.monotonic()
     try:
-
-        for lang_code in LANGUAGES:
-            if lang_code == 'en':
-                continue  # Skip English
-
-            title_field: str = f'title_{lang_code}'
-            description_field: str = f'description_{lang_code}'
-
-            # Query news where the translation is missing or empty
-            query = NewsDB.select().where(
-                (getattr(NewsDB, title_field) >> None) | (getattr(NewsDB, title_field) == '')
-            )
-
-            logger.info(f"Starting translation to '{lang_code}'. Number of news items to translate: {query.count()}")
-
-            total = query.count()
-            last_logged_percent = 0
-            for idx, news in enumerate(query, start=1):
-                original_title: Optional[str] = getattr(news, 'title_en', None)
-                original_description: Optional[str] = getattr(news, 'description_en', None)
-
-                if not original_title and not original_description:
-                    logger.debug(f"Skipping news with url={news.url} — no English text available.")
-                    continue
-
-                try:
-                    translated_title: Optional[str] = translate_text(original_title, lang_code) if original_title else None
-                    translated_description: Optional[str] = translate_text(original_description, lang_code) if original_description else None
-
-                    setattr(news, title_field, translated_title)
-                    setattr(news, description_field, translated_description)
-
-                    news.save()
-                    percent = int((idx / total) * 100)
-                    if percent >= last_logged_percent + 1 or idx == total:
-                        remaining = total - idx
-                        logger.info(f"Translated {idx} ({percent}%), remaining {remaining} news items to '{lang_code}'.")
-                        last_logged_percent = percent
-                except Exception as e:
-                    logger.error(f"Error translating news with url={news.url} to '{lang_code}': {e}")
+        await translate_news()
     finally:
-        news_db.close()
-        # logger.info("The connection to the news database is closed.")
+        logger.info(f"Translating news finished in {time.monotonic() - started:.1f}s. "
+                    f"Translation memory: {translation_memory.stats()}")
 
-async def fill_translated_news_async() -> None:
+
+def fill_translated_news() -> None:
     """
-        Asynchronous wrapper for the 'fill_translated_news' function,
-        runs it in a separate thread to avoid blocking the main event loop.
+    Synchronous entry point of fill_translated_news_async, for scripts and the command line.
+
+    return: None
     """
-    await asyncio.to_thread(fill_translated_news)
+    asyncio.run(fill_translated_news_async())
 
 async def schedule_translate_update() -> None:
     """
@@ -0,0 +1,82 @@
+"""
+Startup state of the bot.
+
+Polling starts right away and the slow warm-up (news ingest and translation) runs in the background.
+Handlers check `startup.ready` to tell users that fresh news are still loading, and a timing report
+with the time to the first handled update is logged once the first update arrives.
+"""
+
+from typing import Awaitable, Callable, Dict, List, Optional
+import time
+
+import asyncio
+
+from utils.logger_config import logger
+
+# Measured from the import of this module, which main.py imports first
+PROCESS_STARTED: float = time.perf_counter()
+
+
+class Startup:
+    """
+        Readiness flag and startup timings.
+
+        Attributes:
+            ready (bool): True when the warm-up jobs have finished.
+            timings (Dict[str, float]): Seconds since process start of each startup milestone.
+    """
+    def __init__(self) -> None:
+        self.ready: bool = False
+        self.timings: Dict[str, float] = {}
+        self._warmup: Optional[asyncio.Task] = None
+
+    def mark(self, milestone: str) -> None:
+        """
+            Record the time of a startup milestone once.
+        """
+        if milestone not in self.timings:
+            self.timings[milestone] = round(time.perf_counter() - PROCESS_STARTED, 3)
+            logger.info(f"Startup: {milestone} after {self.timings[milestone]}s")
+
+    def mark_first_update(self) -> None:
+        """
+            Record the first handled update and log the timing report.
+        """
+        if "first_update" in self.timings:
+            return
+        self.mark("first_update")
+        logger.info(f"Startup timing report: {self.report()}")
+
+    def report(self) -> Dict[str, float]:
+        """
+            Return (Dict[str, float]): the milestones reached so far, in seconds since process start.
+        """
+        return dict(sorted(self.timings.items(), key=lambda item: item[1]))
+
+    def start_warmup(self, jobs: List[Callable[[], Awaitable[None]]]) -> asyncio.Task:
+        """
+            Run the warm-up jobs one after another in a background task; `ready` is set when they finish,
+            even if one of them failed, so the bot never stays in the warming up state.
+
+            Args:
+                jobs (List[Callable[[], Awaitable[None]]]): Coroutine functions, e.g. ingest then translation.
+
+            Returns:
+                asyncio.Task: The background task.
+        """
+        async def warm_up() -> None:
+            try:
+                for job in jobs:
+                    try:
+                        await job()
+                    except Exception as e:
+                        logger.error(f"Error in warm-up job {getattr(job, '__name__', job)}: {e}")
+            finally:
+                self.ready = True
+                self.mark("warmup_done")
+
+        self._warmup = asyncio.create_task(warm_up())
+        return self._warmup
+
+
+startup = Startup()
@@ -0,0 +1,151 @@
+"""
+Translation memory: translations already received from the provider, keyed by
+(SHA-256 of the source text, target language).
+
+It is stored in translation_memory.db with a size-bounded LRU in memory in front of it,
+so failed items retried on the next run, headlines repeated on several URLs and recurring
+phrases are not sent to the provider again. Hit counters show the saved requests and characters.
+"""
+
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+import hashlib
+import threading
+
+from decouple import config
+
+from db_peewee.db_translation_memory_class import (
+    initialize_translation_memory_db, lookup_translations, store_translations,
+)
+from utils.logger_config import logger
+
+TRANSLATION_MEMORY_CACHE_SIZE: int = config('TRANSLATION_MEMORY_CACHE_SIZE', default=20000, cast=int)
+
+
+def source_hash(text: str) -> str:
+    """
+        Return (str): hex SHA-256 of the source text, the key of its translations.
+    """
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class TranslationMemory:
+    """
+        Persistent translation memory with an LRU front.
+
+        Attributes:
+            maxsize (int): Maximum number of translations kept in memory.
+            memory_hits (int): Lookups served from the LRU.
+            db_hits (int): Lookups served from translation_memory.db.
+            misses (int): Lookups that had to go to the provider.
+            saved_chars (int): Characters of source text not sent to the provider.
+    """
+    def __init__(self, maxsize: int = TRANSLATION_MEMORY_CACHE_SIZE) -> None:
+        self.maxsize: int = max(1, maxsize)
+        self.memory_hits: int = 0
+        self.db_hits: int = 0
+        self.misses: int = 0
+        self.saved_chars: int = 0
+        self._entries: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._initialized: bool = False
+
+    def _initialize(self) -> None:
+        if not self._initialized:
+            initialize_translation_memory_db()
+            self._initialized = True
+
+    def lookup(self, texts: Sequence[str], lang: str) -> Tuple[List[Optional[str]], List[int]]:
+        """
+            Look the texts up in memory, then in translation_memory.db.
+
+            Args:
+                texts (Sequence[str]): Source texts.
+                lang (str): Target language code.
+
+            Returns:
+                Tuple[List[Optional[str]], List[int]]: Known translations in the order of texts
+                    (None where unknown) and the indexes of the texts to translate.
+        """
+        results: List[Optional[str]] = [None] * len(texts)
+        hashes = [source_hash(text) for text in texts]
+        unresolved: List[int] = []
+
+        with self._lock:
+            for index, h in enumerate(hashes):
+                translation = self._entries.get((h, lang))
+                if translation is None:
+                    unresolved.append(index)
+                    continue
+                self._entries.move_to_end((h, lang))
+                results[index] = translation
+                self.memory_hits += 1
+                self.saved_chars += len(texts[index])
+
+        if not unresolved:
+            return results, []
+
+        try:
+            self._initialize()
+            stored = lookup_translations(lang, list({hashes[i] for i in unresolved}))
+        except Exception as e:
+            logger.error(f"Error reading translation memory: {e}")
+            stored = {}
+
+        missing: List[int] = []
+        with self._lock:
+            for index in unresolved:
+                translation = stored.get(hashes[index])
+                if translation is None:
+                    missing.append(index)
+                    self.misses += 1
+                    continue
+                results[index] = translation
+                self._remember(hashes[index], lang, translation)
+                self.db_hits += 1
+                self.saved_chars += len(texts[index])
+        return results, missing
+
+    def store(self, lang: str, pairs: Sequence[Tuple[str, str]]) -> None:
+        """
+            Remember translations received from the provider.
+
+            Args:
+                lang (str): Target language code.
+                pairs (Sequence[Tuple[str, str]]): (source text, translation) pairs.
+        """
+        translations: Dict[str, str] = {source_hash(text): translation for text, translation in pairs if translation}
+        if not translations:
+            return
+        with self._lock:
+            for h, translation in translations.items():
+                self._remember(h, lang, translation)
+        try:
+            self._initialize()
+            store_translations(lang, translations)
+        except Exception as e:
+            logger.error(f"Error writing translation memory: {e}")
+
+    def _remember(self, h: str, lang: str, translation: str) -> None:
+        self._entries[(h, lang)] = translation
+        self._entries.move_to_end((h, lang))
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, float]:
+        """
+            Return (Dict[str, float]): hit counters and the characters that were not sent to the provider.
+        """
+        with self._lock:
+            lookups = self.memory_hits + self.db_hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "db_hits": self.db_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.memory_hits + self.db_hits) / lookups, 3) if lookups else 0.0,
+                "saved_chars": self.saved_chars,
+                "size": len(self._entries),
+            }
+
+
+translation_memory = TranslationMemory()
@@ -1,11 +1,279 @@
-from typing import Union, List
+from typing import Any, Callable, Dict, Union, List, Optional, TypeVar
+import random
+import re
+import threading
 
+import asyncio
+from decouple import config
 from deep_translator import GoogleTranslator
 
+from utils.logger_config import logger
+from utils.translation_memory import translation_memory
+
+# Google Translate accepts at most 5000 characters per request
+TRANSLATE_CHUNK_CHARS: int = config('TRANSLATE_CHUNK_CHARS', default=4500, cast=int)
+
+# Concurrent requests over all providers and to one provider, and retries of a failed request
+TRANSLATE_CONCURRENCY: int = config('TRANSLATE_CONCURRENCY', default=6, cast=int)
+TRANSLATE_PROVIDER_CONCURRENCY: int = config('TRANSLATE_PROVIDER_CONCURRENCY', default=4, cast=int)
+TRANSLATE_RETRIES: int = config('TRANSLATE_RETRIES', default=3, cast=int)
+TRANSLATE_BACKOFF: float = config('TRANSLATE_BACKOFF', default=1.0, cast=float)
+
+PROVIDER = "google"
+
+T = TypeVar('T')
+
+BATCH_SEPARATOR = "\n|||\n"
+BATCH_SPLIT_RE = re.compile(r"\s*\|\s*\|\s*\|\s*")
+
+
+_translators = threading.local()
+
+
+def get_translator(target_lang: str) -> GoogleTranslator:
+    """
+    Return (GoogleTranslator): the translator into the target language of the calling thread, created once per thread.
+    An instance is not thread safe: translate() keeps the text in its request parameters until the response arrives.
+    """
+    cache: Optional[Dict[str, GoogleTranslator]] = getattr(_translators, "cache", None)
+    if cache is None:
+        cache = _translators.cache = {}
+    if target_lang not in cache:
+        cache[target_lang] = GoogleTranslator(source='auto', target=target_lang)
+    return cache[target_lang]
+
+
+def translate_one(text: str, target_lang: str) -> Optional[str]:
+    """
+    Return (Optional[str]): the provider's translation of one request, made with the calling thread's translator.
+    """
+    return get_translator(target_lang).translate(text)
+
+
+def chunk_texts(texts: List[str], limit: int = TRANSLATE_CHUNK_CHARS) -> List[List[int]]:
+    """
+    Group texts into chunks whose joined length stays under the provider's character limit.
+
+    Args:
+        texts (List[str]): Texts to translate.
+        limit (int): Maximum number of characters in one request.
+
+    Returns:
+        List[List[int]]: Indexes of the texts in each chunk, in order.
+    """
+    chunks: List[List[int]] = []
+    current: List[int] = []
+    size = 0
+    for index, text in enumerate(texts):
+        extra = len(text) + (len(BATCH_SEPARATOR) if current else 0)
+        if current and size + extra > limit:
+            chunks.append(current)
+            current, size = [], 0
+            extra = len(text)
+        current.append(index)
+        size += extra
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def split_batch(translated: Optional[str], chunk: List[int], results: List[Optional[str]], target_lang: str) -> bool:
+    """
+    Split the translation of a joined chunk on BATCH_SEPARATOR and store the parts in results.
+
+    Args:
+        translated (Optional[str]): Translation of the joined texts.
+        chunk (List[int]): Indexes of the texts in the chunk.
+        results (List[Optional[str]]): Translations being collected.
+        target_lang (str): Target language code, for logging.
+
+    Returns:
+        bool: False if the provider changed the number of parts and the chunk has to be translated text by text.
+    """
+    parts = BATCH_SPLIT_RE.split(translated.strip()) if translated else []
+    if len(parts) != len(chunk):
+        logger.warning(f"Batch translation to '{target_lang}' returned {len(parts)} parts "
+                       f"instead of {len(chunk)}, translating one by one")
+        return False
+    for index, part in zip(chunk, parts):
+        results[index] = part.strip()
+    return True
+
+
+def translate_many(texts: List[str], target_lang: str) -> List[Optional[str]]:
+    """
+    Translate a list of texts with one request per chunk of up to TRANSLATE_CHUNK_CHARS characters.
+    The texts of a chunk are joined with BATCH_SEPARATOR and the translation is split on it again;
+    if the provider changed the number of parts, the chunk is translated text by text.
+    Texts found in the translation memory are not sent to the provider.
+
+    Args:
+        texts (List[str]): Texts to translate.
+        target_lang (str): Target language code, e.g. 'ru', 'fr'.
+
+    Returns:
+        List[Optional[str]]: Translations in the order of texts, None for a text that failed.
+    """
+    results, missing = translation_memory.lookup(texts, target_lang)
+    if missing:
+        translated = _translate_uncached([texts[i] for i in missing], target_lang)
+        for index, translation in zip(missing, translated):
+            results[index] = translation
+        translation_memory.store(target_lang, [(texts[i], results[i]) for i in missing])
+    return results
+
+
+def _translate_uncached(texts: List[str], target_lang: str) -> List[Optional[str]]:
+    results: List[Optional[str]] = [None] * len(texts)
+
+    for chunk in chunk_texts(texts):
+        if len(chunk) > 1:
+            try:
+                translated = translate_one(BATCH_SEPARATOR.join(texts[i] for i in chunk), target_lang)
+                if split_batch(translated, chunk, results, target_lang):
+                    continue
+            except Exception as e:
+                logger.warning(f"Batch translation to '{target_lang}' failed, translating one by one: {e}")
+
+        for index in chunk:
+            try:
+                results[index] = translate_one(texts[index], target_lang)
+            except Exception as e:
+                logger.error(f"Error translating text to '{target_lang}': {e}")
+    return results
+
+
+class TranslationLimiter:
+    """
+        Concurrency caps for translation requests: a global cap and one per provider, see get_limiter.
+
+        Attributes:
+            total (asyncio.Semaphore): Limits requests over all providers.
+            per_provider (int): Maximum concurrent requests to one provider.
+    """
+    def __init__(
+            self,
+            total: int = TRANSLATE_CONCURRENCY,
+            per_provider: int = TRANSLATE_PROVIDER_CONCURRENCY
+    ) -> None:
+        self.total = asyncio.Semaphore(max(1, total))
+        self.per_provider: int = max(1, per_provider)
+        self._providers: Dict[str, asyncio.Semaphore] = {}
+
+    def provider(self, name: str) -> asyncio.Semaphore:
+        """
+            Return (asyncio.Semaphore): the cap of the provider.
+        """
+        if name not in self._providers:
+            self._providers[name] = asyncio.Semaphore(self.per_provider)
+        return self._providers[name]
+
+    async def call(self, func: Callable[..., T], *args: Any, provider: str = PROVIDER) -> T:
+        """
+            Run a blocking provider request in a thread under both caps,
+            retrying failures with exponential backoff and jitter.
+
+            Args:
+                func (Callable[..., T]): Blocking function making the request.
+                *args (Any): Arguments of func.
+                provider (str): Provider name.
+
+            Returns:
+                T: The result of func.
+
+            Raises:
+                Exception: The error of the last attempt.
+        """
+        for attempt in range(TRANSLATE_RETRIES + 1):
+            try:
+                async with self.total, self.provider(provider):
+                    return await asyncio.to_thread(func, *args)
+            except Exception as e:
+                if attempt >= TRANSLATE_RETRIES:
+                    raise
+                delay = TRANSLATE_BACKOFF * 2 ** attempt * random.uniform(0.5, 1.5)
+                logger.warning(f"Translation request to {provider} failed ({e}), retry {attempt + 1} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+        raise RuntimeError("unreachable")
+
+
+_limiter: Optional[TranslationLimiter] = None
+_limiter_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_limiter() -> TranslationLimiter:
+    """
+        Return (TranslationLimiter): the process-wide caps, created on the running event loop on first use,
+        so TRANSLATE_CONCURRENCY and TRANSLATE_PROVIDER_CONCURRENCY hold over all runs together.
+    """
+    global _limiter, _limiter_loop
+    loop = asyncio.get_running_loop()
+    if _limiter is None or _limiter_loop is not loop:
+        _limiter = TranslationLimiter()
+        _limiter_loop = loop
+    return _limiter
+
+
+async def translate_many_async(
+        texts: List[str],
+        target_lang: str,
+        limiter: Optional[TranslationLimiter] = None
+) -> List[Optional[str]]:
+    """
+    Asynchronous translate_many: texts found in the translation memory are not translated again,
+    chunks are sent through the limiter, so several languages can be translated at the same time
+    without exceeding the provider caps.
+    Requests run in worker threads, each with its own translator (see get_translator).
+
+    Args:
+        texts (List[str]): Texts to translate.
+        target_lang (str): Target language code, e.g. 'ru', 'fr'.
+        limiter (Optional[TranslationLimiter]): Caps to use; the process-wide ones if not given.
+
+    Returns:
+        List[Optional[str]]: Translations in the order of texts, None for a text that failed.
+    """
+    results, missing = await asyncio.to_thread(translation_memory.lookup, texts, target_lang)
+    if missing:
+        translated = await _translate_uncached_async([texts[i] for i in missing], target_lang, limiter)
+        for index, translation in zip(missing, translated):
+            results[index] = translation
+        await asyncio.to_thread(translation_memory.store, target_lang, [(texts[i], results[i]) for i in missing])
+    return results
+
+
+async def _translate_uncached_async(
+        texts: List[str],
+        target_lang: str,
+        limiter: Optional[TranslationLimiter]
+) -> List[Optional[str]]:
+    limiter = limiter or get_limiter()
+    results: List[Optional[str]] = [None] * len(texts)
+
+    for chunk in chunk_texts(texts):
+        if len(chunk) > 1:
+            try:
+                translated = await limiter.call(
+                    translate_one, BATCH_SEPARATOR.join(texts[i] for i in chunk), target_lang
+                )
+                if split_batch(translated, chunk, results, target_lang):
+                    continue
+            except Exception as e:
+                logger.warning(f"Batch translation to '{target_lang}' failed, translating one by one: {e}")
+
+        for index in chunk:
+            try:
+                results[index] = await limiter.call(translate_one, texts[index], target_lang)
+            except Exception as e:
+                logger.error(f"Error translating text to '{target_lang}': {e}")
+    return results
+
+
 def translate_text(texts: Union[str, List[str]], target_lang: str) -> Union[str, List[str]]:
     """
     Translate a text string or a list of text strings into the target language,
-    automatically detecting the source language.
+    automatically detecting the source language. A list is translated in batches, see translate_many.
+    Translations are looked up in the translation memory first.
 
     Args:
         texts (Union[str, List[str]]): Text or list of texts to translate.
@@ -17,11 +285,9 @@ def translate_text(texts: Union[str, List[str]], target_lang: str) -> Union[str,
     Raises:
         ValueError: If `texts` is neither a string nor a list of strings.
     """
-    translator = GoogleTranslator(source='auto', target=target_lang)
-
     if isinstance(texts, str):
-        return translator.translate(texts)
+        return translate_many([texts], target_lang)[0] if texts.strip() else texts
     elif isinstance(texts, list):
-        return translator.translate_batch(texts)
+        return translate_many(texts, target_lang)
     else:
-        raise ValueError("texts: must be a string or a list of strings.")
\ No newline at end of file
+        raise ValueError("texts: must be a string or a list of strings.")
@@ -0,0 +1,144 @@
+"""
+In-process cache of user profiles (language, news choice and keywords).
+
+Every update reads the profile in UserLanguageMiddleware and handlers read it again,
+so the lookups are served from memory. User updates are written through to the cache
+when they are queued in the write-behind buffer (db_peewee.user_write_buffer), entries
+expire after a TTL and the least recently used ones are evicted when the cache is full.
+"""
+
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+import threading
+import time
+
+from decouple import config
+
+USER_CACHE_SIZE: int = config('USER_CACHE_SIZE', default=10000, cast=int)
+USER_CACHE_TTL: float = config('USER_CACHE_TTL', default=900, cast=float)
+
+
+class UserProfile:
+    """
+        Settings of a user needed to answer an update.
+
+        Attributes:
+            user_id (int): Telegram user id.
+            language_code (str): Language which user was selected, "en" by default.
+            news_choice (Optional[str]): Type of format news (news_all or news_keyword).
+            news_keywords (Optional[str]): Comma separated keywords that the user selected.
+    """
+    __slots__ = ("user_id", "language_code", "news_choice", "news_keywords")
+
+    def __init__(
+            self,
+            user_id: int,
+            language_code: Optional[str] = None,
+            news_choice: Optional[str] = None,
+            news_keywords: Optional[str] = None
+    ) -> None:
+        self.user_id = user_id
+        self.language_code = language_code or "en"
+        self.news_choice = news_choice
+        self.news_keywords = news_keywords
+
+    def __repr__(self) -> str:
+        return (f"UserProfile(user_id={self.user_id}, language_code={self.language_code!r}, "
+                f"news_choice={self.news_choice!r}, news_keywords={self.news_keywords!r})")
+
+
+class UserProfileCache:
+    """
+        Size-bounded LRU cache of user profiles with a TTL.
+
+        Lookups that went to the database are stored with the generation captured before
+        the query; a write-through that happened meanwhile bumps the generation,
+        so a profile read before the write never overwrites the newer one.
+
+        Attributes:
+            maxsize (int): Maximum number of cached profiles.
+            ttl (float): Seconds a profile is served from memory.
+            generation (int): Incremented by every write-through.
+            hits (int): Number of lookups served from memory.
+            misses (int): Number of lookups that went to the database.
+    """
+    def __init__(self, maxsize: int = USER_CACHE_SIZE, ttl: float = USER_CACHE_TTL) -> None:
+        self.maxsize: int = max(1, maxsize)
+        self.ttl: float = ttl
+        self.generation: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self._entries: "OrderedDict[int, Tuple[float, UserProfile]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> Optional[UserProfile]:
+        """
+            Return (Optional[UserProfile]): the cached profile or None if it is missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[user_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+    def peek(self, user_id: int) -> Optional[UserProfile]:
+        """
+            Return (Optional[UserProfile]): the cached profile without counting a lookup or refreshing its LRU position.
+        """
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] < time.monotonic():
+                return None
+            return entry[1]
+
+    def put(self, profile: UserProfile, generation: int) -> None:
+        """
+            Store a profile read from the database while the cache was at the given generation.
+        """
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._store(profile)
+
+    def write_through(self, profile: UserProfile) -> None:
+        """
+            Store a profile that was just written to users.db.
+        """
+        with self._lock:
+            self.generation += 1
+            self._store(profile)
+
+    def invalidate(self, user_id: int) -> None:
+        """
+            Drop the cached profile of a user.
+        """
+        with self._lock:
+            self.generation += 1
+            self._entries.pop(user_id, None)
+
+    def _store(self, profile: UserProfile) -> None:
+        self._entries[profile.user_id] = (time.monotonic() + self.ttl, profile)
+        self._entries.move_to_end(profile.user_id)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, float]:
+        """
+            Return (Dict[str, float]): hit and miss counters for tuning the cache size and TTL.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "size": len(self._entries),
+            }
+
+
+user_cache = UserProfileCache()